@@ -0,0 +1,119 @@
+"""
+Answers large batches of queries on a process pool.
+
+Each worker receives the graph once, as the flat arrays of a CompactGraph,
+and then works through groups of queries that share a source: one minimax
+sweep answers every minimum_range query from a base, and one breadth
+first search answers every find_path query from a base with the same
+range. Emergency ranges only scan the convex hull, so they are answered
+in the calling process.
+"""
+
+import functools
+import multiprocessing
+import os
+
+from compact import CompactGraph
+
+# Set in each worker process by _init_worker. The in-process path passes
+# its graph along instead, so batches running side by side in one
+# process never share it.
+_graph = None
+
+
+def _init_worker(xs, ys, offsets, targets):
+    global _graph
+    _graph = CompactGraph(xs, ys, offsets, targets)
+
+
+def _run_group(group):
+    return _run_group_on(_graph, group)
+
+
+def _run_group_on(graph, group):
+    # -> list of (query position, answer in rows)
+    kind, b, r, members = group
+
+    if kind == 'minimum_range':
+        D = graph.minimum_range_all(b)
+        return [(i, D[s]) for i, s in members]
+
+    if len(members) == 1:
+        i, s = members[0]
+        return [(i, graph.find_path(b, s, r))]
+
+    parent = graph.search_tree(b, r)
+    return [(i, CompactGraph.tree_path(parent, s)) for i, s in members]
+
+
+def run_queries(G, queries, processes=None):
+    """
+    Answers ('minimum_range', b, s), ('find_path', b, s, r) and
+    ('find_emergency_range', v) queries, yielding the answers in the order
+    of the queries.
+    :param G: The graph, which must not change until the generator is done.
+    :param queries: Iterable of query tuples.
+    :param processes: Number of worker processes, defaults to the CPU count.
+                      0 or 1 answers everything in this process.
+    """
+
+    queries = list(queries)
+    C = G.compact()
+    results = [None] * len(queries)
+    done = [False] * len(queries)
+
+    # Group the searches by source, in order of their first query.
+    groups = {}
+    emergencies = []
+    for i, query in enumerate(queries):
+        kind = query[0]
+        if kind == 'minimum_range':
+            key = (kind, C.row(query[1]), None)
+            target = C.row(query[2])
+        elif kind == 'find_path':
+            key = (kind, C.row(query[1]), query[3])
+            target = C.row(query[2])
+        elif kind == 'find_emergency_range':
+            emergencies.append(i)
+            continue
+        else:
+            raise ValueError("Unknown query type {}!".format(kind))
+        groups.setdefault(key, []).append((i, target))
+
+    for i, answer in zip(emergencies, G.find_emergency_ranges([queries[i][1] for i in emergencies])):
+        results[i] = answer
+        done[i] = True
+
+    work = [key + (members,) for key, members in groups.items()]
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    if processes <= 1 or len(work) <= 1:
+        answered = map(functools.partial(_run_group_on, C), work)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes, _init_worker, (C.xs, C.ys, C.offsets, C.targets))
+        answered = pool.imap(_run_group, work)
+
+    # Hand answers back as soon as every query before them is answered.
+    position = 0
+    try:
+        for group, answers in zip(work, answered):
+            for i, answer in answers:
+                if group[0] == 'find_path' and answer is not None:
+                    answer = [C.vertices[k] for k in answer]
+                results[i] = answer
+                done[i] = True
+
+            while position < len(queries) and done[position]:
+                yield results[position]
+                results[position] = None
+                position += 1
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    while position < len(queries):
+        yield results[position]
+        position += 1
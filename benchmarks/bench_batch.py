@@ -0,0 +1,43 @@
+"""
+Throughput of Graph.run_queries for a safety-report style workload
+(every query type from a set of bases) with different pool sizes.
+
+python3 -m benchmarks.bench_batch [vertices] [bases]
+"""
+
+import os
+import random
+import sys
+import time
+
+from benchmarks.common import random_geometric_graph
+
+
+def main(n=20000, bases=16):
+    G, vertices = random_geometric_graph(n, seed=n)
+    rng = random.Random(n)
+
+    queries = []
+    for b in rng.sample(vertices, bases):
+        r = 0.5
+        for s in rng.sample(vertices, 200):
+            queries.append(('minimum_range', b, s))
+            queries.append(('find_path', b, s, r))
+        queries.append(('find_emergency_range', b))
+
+    print("{} vertices, {} queries, {} CPUs".format(n, len(queries), os.cpu_count()))
+
+    start = time.perf_counter()
+    expected = [getattr(G, q[0])(*q[1:]) for q in queries]
+    print("{:<16} {:>10.2f} s".format("one by one", time.perf_counter() - start))
+
+    for processes in sorted({1, 2, 4, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        answers = list(G.run_queries(queries, processes))
+        seconds = time.perf_counter() - start
+        assert answers == expected
+        print("{:<16} {:>10.2f} s".format("{} process(es)".format(processes), seconds))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
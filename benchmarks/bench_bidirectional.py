@@ -0,0 +1,68 @@
+"""
+Graph.find_path searching from b only against searching from both ends,
+on grid and random geometric layouts. Targets are picked 10 and 50 hops
+away and as far from b as possible, with a range that covers the whole
+graph.
+
+python3 -m benchmarks.bench_bidirectional [vertices ...]
+"""
+
+import random
+import sys
+
+from benchmarks.common import grid_graph, random_geometric_graph, timed
+
+
+def layouts(n):
+    side = int(n ** 0.5)
+    yield "grid", grid_graph(side)
+    yield "geometric", random_geometric_graph(n, seed=n)
+
+
+def hops_away(b, k):
+    # A station exactly k hops from b, or the furthest one if there is none.
+    seen = {b}
+    layer = [b]
+    for _ in range(k):
+        following = [u for v in layer for u in v._adjacent if u not in seen]
+        following = list(dict.fromkeys(following))
+        if not following:
+            break
+        seen.update(following)
+        layer = following
+    return layer[0]
+
+
+def main(sizes, pairs=20):
+    print("{:>10} {:>9} {:>6} {:>12} {:>12} {:>8}".format(
+        "layout", "V", "hops", "one side (s)", "both (s)", "speedup"))
+
+    for n in sizes:
+        for name, (G, vertices) in layouts(n):
+            rng = random.Random(n)
+            r = 2 * max(G.distance(v, vertices[0]) for v in vertices)
+
+            for label, steps in (("10", 10), ("50", 50), ("far", None)):
+                one_side = both = 0.0
+                hops = 0
+                for _ in range(pairs):
+                    b = rng.choice(vertices)
+                    if steps is None:
+                        s = max(vertices, key=lambda v: G.distance(v, b))
+                    else:
+                        s = hops_away(b, steps)
+                    seconds, path = timed(G.find_path, b, s, r, repeat=1)
+                    one_side += seconds
+                    seconds, other = timed(G.find_path, b, s, r, True, repeat=1)
+                    both += seconds
+                    if path is not None:
+                        assert len(path) == len(other)
+                        hops = max(hops, len(path) - 1)
+
+                print("{:>10} {:>9} {:>6} {:>12.4f} {:>12.4f} {:>8.1f}".format(
+                    name + " " + label, len(vertices), hops, one_side / pairs, both / pairs,
+                    one_side / both if both else float('inf')))
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,73 @@
+"""
+Latency and peak memory of Graph.find_path on random geometric graphs,
+against the original path-copying search where it still finishes.
+
+python3 -m benchmarks.bench_find_path [edges ...]
+"""
+
+import sys
+import tracemalloc
+
+from benchmarks.common import random_geometric_graph, timed
+
+
+def legacy_find_path(G, b, s, r):
+    # The search find_path used before parent pointers: every frontier
+    # entry carries its own copy of the path.
+    path = [b]
+    storage = [path]
+
+    while path and storage:
+        path = storage.pop(0)
+        cursor = path[-1]
+
+        if cursor == s:
+            return path
+
+        for edge in cursor.edges:
+            opposite = G.opposite(edge, cursor)
+
+            if G.distance(opposite, b) <= r and opposite not in path:
+                new_path = list(path)
+                new_path.append(opposite)
+                storage.append(new_path)
+
+
+def peak_memory(func, *args):
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(edge_counts, legacy_limit=10000):
+    print("{:>9} {:>8} {:>6} {:>12} {:>12} {:>12} {:>12}".format(
+        "E", "V", "hops", "time (s)", "peak (KiB)", "legacy (s)", "legacy KiB"))
+
+    for edges in edge_counts:
+        # Average degree is about 1.5^2 * pi, roughly 7.
+        G, vertices = random_geometric_graph(edges * 2 // 7, seed=edges)
+        n_edges = sum(len(v.edges) for v in vertices) // 2
+
+        b = vertices[0]
+        s = max(vertices, key=lambda v: G.distance(v, b) if G.minimum_range(b, v) < float('inf') else -1)
+        r = G.minimum_range(b, s)
+
+        seconds, path = timed(G.find_path, b, s, r)
+        peak = peak_memory(G.find_path, b, s, r)
+
+        legacy = ("-", "-")
+        if n_edges <= legacy_limit:
+            # Only ask the old search for a nearby station, it is exponential.
+            near = path[min(len(path) - 1, 6)]
+            legacy_seconds, _ = timed(legacy_find_path, G, b, near, r, repeat=1)
+            legacy = ("{:.4f}".format(legacy_seconds),
+                      "{:.0f}".format(peak_memory(legacy_find_path, G, b, near, r) / 1024))
+
+        print("{:>9} {:>8} {:>6} {:>12.4f} {:>12.0f} {:>12} {:>12}".format(
+            n_edges, len(vertices), len(path) - 1, seconds, peak / 1024, *legacy))
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [10000, 100000, 1000000])
@@ -0,0 +1,69 @@
+"""
+Hash and equality throughput of Vertex and Edge, against the repr based
+versions they replaced.
+
+python3 -m benchmarks.bench_hashing
+"""
+
+import timeit
+
+from vertex import Vertex
+from edge import Edge
+
+
+class LegacyVertex:
+    def __init__(self, x_pos, y_pos):
+        self.x_pos = x_pos
+        self.y_pos = y_pos
+
+    def __eq__(self, other):
+        if isinstance(other, LegacyVertex):
+            return other.x_pos == self.x_pos and other.y_pos == self.y_pos
+        return False
+
+    def __repr__(self):
+        return "V({}, {})".format(self.x_pos, self.y_pos)
+
+    def __hash__(self):
+        return hash(repr(self))
+
+
+class LegacyEdge:
+    def __init__(self, u, v):
+        self.u = u
+        self.v = v
+
+    def __eq__(self, other):
+        if isinstance(other, LegacyEdge):
+            return (other.u == self.v or other.u == self.u) and (other.v == self.u or other.v == self.v)
+        return False
+
+    def __repr__(self):
+        return "<{}-{}>".format(self.u, self.v)
+
+    def __hash__(self):
+        return hash(repr(self))
+
+
+def measure(label, stmt, count, number=20):
+    seconds = min(timeit.repeat(stmt, number=number, repeat=3)) / number
+    print("{:<36} {:>10.0f} ops/s".format(label, count / seconds))
+
+
+def main(n=10000):
+    for name, V, E in (("legacy", LegacyVertex, LegacyEdge), ("current", Vertex, Edge)):
+        vertices = [V(i * 0.5, i * 0.25) for i in range(n)]
+        edges = [E(vertices[i], vertices[i - 1]) for i in range(1, n)]
+        reversed_edges = [E(e.v, e.u) for e in edges]
+        vertex_set = set(vertices)
+        edge_set = set(edges)
+
+        measure(name + " vertex hash", lambda: [hash(v) for v in vertices], n)
+        measure(name + " vertex set lookup", lambda: [v in vertex_set for v in vertices], n)
+        measure(name + " edge hash", lambda: [hash(e) for e in edges], n - 1)
+        measure(name + " edge equality", lambda: [a == b for a, b in zip(edges, reversed_edges)], n - 1)
+        measure(name + " edge set lookup", lambda: [e in edge_set for e in reversed_edges], n - 1)
+
+
+if __name__ == '__main__':
+    main()
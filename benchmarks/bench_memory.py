@@ -0,0 +1,61 @@
+"""
+Memory used by a random geometric graph stored as the original
+__dict__ based objects, as the current Vertex/Edge objects and as a
+CompactGraph.
+
+python3 -m benchmarks.bench_memory [vertices ...]
+"""
+
+import random
+import sys
+import tracemalloc
+
+from benchmarks.bench_hashing import LegacyVertex, LegacyEdge
+from benchmarks.common import random_geometric_graph
+
+
+def traced(build):
+    # Bytes still allocated by build() once it returns, and what it returned.
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+
+def legacy_copy(G):
+    # The same graph as the original classes: a __dict__ per object and a
+    # list of edges per vertex.
+    vertices = {}
+    for v in G._vertices:
+        copy = LegacyVertex(v.x_pos, v.y_pos)
+        copy.edges = []
+        vertices[v] = copy
+    for v in G._vertices:
+        for u in v._adjacent:
+            if v.id < u.id:
+                e = LegacyEdge(vertices[v], vertices[u])
+                vertices[v].edges.append(e)
+                vertices[u].edges.append(e)
+    return list(vertices.values())
+
+
+def main(sizes):
+    print("{:>9} {:>9} {:>14} {:>14} {:>14}".format(
+        "V", "E", "legacy (MiB)", "objects (MiB)", "compact (MiB)"))
+
+    for n in sizes:
+        random.seed(n)
+        objects, (G, vertices) = traced(lambda: random_geometric_graph(n, seed=n))
+        legacy, _ = traced(lambda: legacy_copy(G))
+        compact, C = traced(lambda: G.compact())
+        # The compact copy keeps the Vertex tuple for mapping rows back,
+        # which a graph loaded straight into arrays would not have.
+        compact -= sys.getsizeof(C.vertices)
+
+        print("{:>9} {:>9} {:>14.1f} {:>14.1f} {:>14.1f}".format(
+            n, len(C.targets) // 2, legacy / 2**20, objects / 2**20, compact / 2**20))
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,39 @@
+"""
+Compares a cold Graph.minimum_range (no cached range index or distances
+for the base) against the original list based implementation it
+replaced.
+
+python3 -m benchmarks.bench_minimum_range
+"""
+
+import math
+import random
+import sys
+
+from benchmarks.common import random_geometric_graph, timed
+from tests.helpers import legacy_minimum_range
+
+
+def cold_minimum_range(G, b, s):
+    # Forget everything cached for b first, so every repeat does the work.
+    G._range_indexes.clear()
+    G._base_distances.clear()
+    return G.minimum_range(b, s)
+
+
+def main(sizes):
+    print("{:>8} {:>12} {:>12} {:>8}".format("V", "legacy (s)", "current (s)", "speedup"))
+    for n in sizes:
+        G, vertices = random_geometric_graph(n, seed=n)
+        rng = random.Random(n)
+        b, s = rng.choice(vertices), rng.choice(vertices)
+
+        new_time, new = timed(cold_minimum_range, G, b, s)
+        old_time, old = timed(legacy_minimum_range, G, b, s, repeat=1)
+        assert new == old or math.isclose(new, old), (new, old)
+
+        print("{:>8} {:>12.4f} {:>12.4f} {:>7.1f}x".format(n, old_time, new_time, old_time / new_time))
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [250, 500, 1000, 2000])
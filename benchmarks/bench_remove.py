@@ -0,0 +1,64 @@
+"""
+Graph.remove_vertices against calling Graph.remove_vertex for each
+vertex, on hub-and-spoke graphs: the burst is a hub together with all
+of its spokes. Both start with a snapshot taken, a tracked base and a
+few cached range indexes, so every removal has something to update.
+
+The burst saves the per call invalidation and tracker passes. Dropping
+the range indexes that reach the hub and relabelling the tracker's
+subtree below it cost the same either way, and on large graphs they
+are most of the time.
+
+python3 -m benchmarks.bench_remove [vertices ...]
+"""
+
+import sys
+import time
+
+from benchmarks.common import hub_and_spoke_graph
+
+
+def prepared(n):
+    # A fresh graph and the burst to remove from it.
+    G, vertices = hub_and_spoke_graph(n, seed=n)
+    hubs = max(1, int(n ** 0.5))
+    hub = vertices[0]
+    burst = [hub] + [v for v in hub._adjacent if v not in vertices[:hubs]]
+
+    G.track_minimum_range(vertices[1])
+    for b in vertices[hubs:hubs + 4]:
+        G.minimum_range_all(b)
+    G.snapshot()
+    return G, burst
+
+
+def one_by_one(G, burst):
+    for v in burst:
+        G.remove_vertex(v)
+
+
+def together(G, burst):
+    G.remove_vertices(burst)
+
+
+def best(remove, n, repeat=5):
+    # Each run removes from its own graph, built outside the timing.
+    seconds = float('inf')
+    for _ in range(repeat):
+        G, burst = prepared(n)
+        start = time.perf_counter()
+        remove(G, burst)
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds, len(burst)
+
+
+def main(sizes):
+    print("{:>8} {:>7} {:>14} {:>12} {:>8}".format("V", "burst", "one by one (s)", "burst (s)", "speedup"))
+    for n in sizes:
+        old_time, k = best(one_by_one, n)
+        new_time, _ = best(together, n)
+        print("{:>8} {:>7} {:>14.4f} {:>12.4f} {:>7.1f}x".format(n, k, old_time, new_time, old_time / new_time))
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000])
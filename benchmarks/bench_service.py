@@ -0,0 +1,68 @@
+"""
+Load test of GraphService: many concurrent in-process clients sending
+queries with occasional drift updates. Reports p50 and p99 latency.
+
+python3 -m benchmarks.bench_service [vertices] [clients] [requests per client]
+"""
+
+import asyncio
+import random
+import sys
+import time
+
+from benchmarks.common import percentile, random_geometric_graph
+from service import GraphService
+
+
+async def client(service, vertices, bases, rng, count, latencies):
+    for _ in range(count):
+        roll = rng.random()
+        start = time.perf_counter()
+        if roll < 0.02:
+            v = rng.choice(vertices)
+            await service.move_vertex(v, v.x_pos + rng.uniform(-1e-4, 1e-4), v.y_pos)
+            kind = 'move_vertex'
+        elif roll < 0.6:
+            await service.minimum_range(rng.choice(bases), rng.choice(vertices))
+            kind = 'minimum_range'
+        elif roll < 0.9:
+            await service.find_path(rng.choice(bases), rng.choice(vertices), 0.3)
+            kind = 'find_path'
+        else:
+            await service.find_emergency_range(rng.choice(vertices))
+            kind = 'find_emergency_range'
+        latencies.setdefault(kind, []).append(time.perf_counter() - start)
+
+
+async def run(n, clients, count):
+    G, vertices = random_geometric_graph(n, seed=n)
+    service = GraphService(G)
+    rng = random.Random(n)
+    bases = rng.sample(vertices, 4)
+
+    latencies = {}
+    start = time.perf_counter()
+    await asyncio.gather(*[client(service, vertices, bases, random.Random(i), count, latencies)
+                           for i in range(clients)])
+    seconds = time.perf_counter() - start
+
+    print("{} vertices, {} clients, {} requests in {:.2f} s ({:.0f} req/s), {} computed".format(
+        n, clients, service.requests, seconds, service.requests / seconds, service.computations))
+    print("{:<22} {:>8} {:>10} {:>10}".format("request", "count", "p50 (ms)", "p99 (ms)"))
+    everything = []
+    for kind, values in sorted(latencies.items()):
+        everything.extend(values)
+        values = sorted(values)
+        print("{:<22} {:>8} {:>10.2f} {:>10.2f}".format(
+            kind, len(values), percentile(values, 50) * 1000, percentile(values, 99) * 1000))
+    everything.sort()
+    print("{:<22} {:>8} {:>10.2f} {:>10.2f}".format(
+        "all", len(everything), percentile(everything, 50) * 1000, percentile(everything, 99) * 1000))
+
+
+def main(n=5000, clients=64, count=50):
+    asyncio.run(run(n, clients, count))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,87 @@
+"""
+Cost of taking graph snapshots, and query throughput of reader threads
+on a snapshot while a writer keeps moving stations.
+
+For each size it times a full capture, then the snapshot after 1, 100
+and 1000 moves, next to copying two plain dicts with an entry per
+vertex (what every snapshot cost before snapshots shared chunks). The
+readers run on the last size.
+
+python3 -m benchmarks.bench_snapshot [vertices ...] [--readers 4]
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.common import random_geometric_graph
+from snapshot import GraphSnapshot
+
+
+def capture_costs(G, vertices, rng):
+    n = len(vertices)
+    start = time.perf_counter()
+    GraphSnapshot.capture(G)
+    print("{} vertices: full capture {:.1f} ms".format(n, (time.perf_counter() - start) * 1000))
+
+    positions = {v: (v.x_pos, v.y_pos) for v in vertices}
+    adjacency = {v: tuple(v._adjacent) for v in vertices}
+    start = time.perf_counter()
+    positions.copy()
+    adjacency.copy()
+    print("{} vertices: copying two dicts {:.1f} ms".format(n, (time.perf_counter() - start) * 1000))
+
+    G.snapshot()
+    for moved in (1, 100, 1000):
+        for v in rng.sample(vertices, moved):
+            G.move_vertex(v, v.x_pos + 1e-6, v.y_pos)
+        start = time.perf_counter()
+        G.snapshot()
+        print("after {:>5} moves: snapshot {:.2f} ms".format(moved, (time.perf_counter() - start) * 1000))
+
+
+def main(sizes=(500000, 1000000), readers=4, seconds=3.0):
+    for n in sizes:
+        G, vertices = random_geometric_graph(n, seed=n)
+        rng = random.Random(n)
+        capture_costs(G, vertices, rng)
+
+    # Readers query whatever snapshot was published last.
+    published = [G.snapshot()]
+    stop = threading.Event()
+    counts = [0] * readers
+
+    def reader(k):
+        local = random.Random(k)
+        while not stop.is_set():
+            snap = published[0]
+            b, s = local.choice(vertices[:100]), local.choice(vertices[:100])
+            snap.find_path(b, s, 0.2)
+            counts[k] += 1
+
+    def writer():
+        local = random.Random(-1)
+        while not stop.is_set():
+            for v in local.sample(vertices, 50):
+                G.move_vertex(v, v.x_pos + local.uniform(-1e-5, 1e-5), v.y_pos)
+            published[0] = G.snapshot()
+
+    threads = [threading.Thread(target=reader, args=(k,)) for k in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    print("{} readers: {:.0f} find_path/s on snapshots while writing".format(readers, sum(counts) / seconds))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('sizes', nargs='*', type=int, default=[500000, 1000000])
+    parser.add_argument('--readers', type=int, default=4)
+    args = parser.parse_args()
+    main(args.sizes, args.readers)
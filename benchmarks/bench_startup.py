@@ -0,0 +1,59 @@
+"""
+Cold start: rebuilding a graph with insert_vertex/insert_edge against
+Graph.open on a saved file, up to the first answered query.
+
+python3 -m benchmarks.bench_startup [edges]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from graph import Graph
+
+
+def main(edges=1000000):
+    n = edges // 5
+    rng = random.Random(edges)
+    xs = [rng.random() for _ in range(n)]
+    ys = [rng.random() for _ in range(n)]
+    pairs = set()
+    while len(pairs) < edges:
+        i, j = rng.randrange(n), rng.randrange(n)
+        if i != j:
+            pairs.add((min(i, j), max(i, j)))
+    pairs = list(pairs)
+
+    start = time.perf_counter()
+    G = Graph()
+    vertices = [G.insert_vertex(x, y) for x, y in zip(xs, ys)]
+    for i, j in pairs:
+        G.insert_edge(vertices[i], vertices[j])
+    G.find_path(vertices[0], vertices[1], 0.5)
+    print("{} vertices, {} edges".format(n, edges))
+    print("{:<34} {:>10.3f} s".format("insert_vertex/insert_edge + query", time.perf_counter() - start))
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'stations.graph')
+        start = time.perf_counter()
+        G.save(path)
+        print("{:<34} {:>10.3f} s ({:.1f} MiB)".format(
+            "save", time.perf_counter() - start, os.path.getsize(path) / 2**20))
+
+        start = time.perf_counter()
+        C = Graph.open(path)
+        opened = time.perf_counter() - start
+        C.find_path(0, 1, 0.5)
+        print("{:<34} {:>10.3f} s".format("open", opened))
+        print("{:<34} {:>10.3f} s".format("open + query", time.perf_counter() - start))
+
+        start = time.perf_counter()
+        C.to_graph()
+        print("{:<34} {:>10.3f} s".format("materialise objects", time.perf_counter() - start))
+        C.close()
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,140 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Run the scripts from the folder with graph.py, e.g.
+
+python3 -m benchmarks.bench_minimum_range
+"""
+
+import math
+import random
+import time
+
+from graph import Graph
+
+
+def random_geometric_graph(n, radius=None, seed=0):
+    """
+    Scatter n stations over the unit square and link every pair closer
+    than radius.
+    :param n: Number of vertices.
+    :param radius: Link distance, defaults to a value that keeps the graph
+                   (almost surely) connected.
+    :param seed: Seed for the random generator.
+    :return: (graph, list of vertices)
+    """
+
+    rng = random.Random(seed)
+    if radius is None:
+        radius = 1.5 * (1.0 / n) ** 0.5
+
+    G = Graph()
+    vertices = [G.insert_vertex(rng.random(), rng.random()) for _ in range(n)]
+
+    # Bucket the vertices into radius sized cells so only neighbouring
+    # cells need to be compared.
+    cells = {}
+    for v in vertices:
+        key = (int(v.x_pos / radius), int(v.y_pos / radius))
+        cells.setdefault(key, []).append(v)
+
+    for (cx, cy), members in cells.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                others = cells.get((cx + dx, cy + dy))
+                if not others:
+                    continue
+                for u in members:
+                    for w in others:
+                        if id(u) < id(w) and Graph.distance(u, w) <= radius:
+                            G.insert_edge(u, w)
+
+    return G, vertices
+
+
+def grid_graph(side, spacing=1.0):
+    """
+    side x side stations on a square grid, each linked to its right and
+    upper neighbours.
+    :return: (graph, list of vertices in row order)
+    """
+
+    G = Graph()
+    vertices = [G.insert_vertex(x * spacing, y * spacing) for y in range(side) for x in range(side)]
+    for y in range(side):
+        for x in range(side):
+            v = vertices[y * side + x]
+            if x + 1 < side:
+                G.insert_edge(v, vertices[y * side + x + 1])
+            if y + 1 < side:
+                G.insert_edge(v, vertices[(y + 1) * side + x])
+    return G, vertices
+
+
+def hub_and_spoke_graph(n, hubs=None, seed=0):
+    """
+    Stations clustered around hubs. Every station links to its hub and
+    each hub links to its nearest few hubs and to the next hub from left
+    to right, so the hubs form one connected backbone.
+    :param n: Number of vertices, hubs included.
+    :param hubs: Number of hubs, defaults to about sqrt(n).
+    :param seed: Seed for the random generator.
+    :return: (graph, list of vertices, hubs first)
+    """
+
+    rng = random.Random(seed)
+    hubs = hubs or max(1, int(n ** 0.5))
+
+    G = Graph()
+    centres = [G.insert_vertex(rng.random(), rng.random()) for _ in range(hubs)]
+    vertices = list(centres)
+
+    spread = 0.3 / hubs ** 0.5
+    for i in range(n - hubs):
+        hub = centres[i % hubs]
+        v = G.insert_vertex(hub.x_pos + rng.gauss(0, spread), hub.y_pos + rng.gauss(0, spread))
+        G.insert_edge(hub, v)
+        vertices.append(v)
+
+    ordered = sorted(centres, key=lambda h: h.x_pos)
+    backbone = list(zip(ordered, ordered[1:]))
+    for h in centres:
+        for other in sorted(centres, key=lambda c: Graph.distance(h, c))[1:4]:
+            backbone.append((h, other))
+    G.bulk_insert_edges(backbone)
+
+    return G, vertices
+
+
+LAYOUTS = {
+    'geometric': lambda n, seed: random_geometric_graph(n, seed=seed),
+    'grid': lambda n, seed: grid_graph(max(1, int(round(n ** 0.5)))),
+    'hub': lambda n, seed: hub_and_spoke_graph(n, seed=seed),
+}
+
+
+def timed(func, *args, repeat=3):
+    """
+    Best wall time of calling func(*args) a few times.
+    :return: (seconds, result of the last call)
+    """
+
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def percentile(ordered, q):
+    """
+    Nearest rank percentile of an already sorted list, 0.0 if it is empty.
+    """
+
+    if not ordered:
+        return 0.0
+    # q * n first, so whole ranks like 7% of 100 stay exact.
+    k = max(0, math.ceil(q * len(ordered) / 100) - 1)
+    return ordered[k]
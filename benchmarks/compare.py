@@ -0,0 +1,74 @@
+"""
+Compares two result files written by benchmarks/suite.py and lists the
+operations whose median latency or peak memory got worse by more than
+the threshold. Exits with status 1 when there are any, so it can gate a
+merge.
+
+python3 -m benchmarks.compare old.json new.json [--threshold 0.1]
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        report = json.load(f)
+    rows = {(r['layout'], r['vertices'], r['operation']): r for r in report['results']}
+    return report, rows
+
+
+def latency(row):
+    # Median latency, or the single run for builds.
+    return row.get('p50_ms', row['seconds'] * 1000)
+
+
+def change(old, new):
+    # Relative change from old to new, None when old is zero.
+    return (new - old) / old if old else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="relative slowdown or memory growth that counts as a regression")
+    parser.add_argument('--min-kib', type=float, default=16,
+                        help="memory growth smaller than this is noise")
+    args = parser.parse_args()
+
+    old_report, old = load(args.old)
+    new_report, new = load(args.new)
+    print("{} -> {}".format(old_report.get('commit'), new_report.get('commit')))
+    print("{:<10} {:>8} {:<21} {:>10} {:>10} {:>8} {:>8}".format(
+        "layout", "V", "operation", "old p50", "new p50", "latency", "memory"))
+
+    regressions = []
+    for key in sorted(set(old) & set(new)):
+        a, b = old[key], new[key]
+        slower = change(latency(a), latency(b))
+        bigger = change(a.get('peak_kib', 0), b.get('peak_kib', 0))
+        grew = b.get('peak_kib', 0) - a.get('peak_kib', 0) > args.min_kib
+
+        flag = ""
+        if (slower or 0) > args.threshold or (grew and (bigger or 0) > args.threshold):
+            regressions.append(key)
+            flag = "  <- regression"
+
+        print("{:<10} {:>8} {:<21} {:>10.3f} {:>10.3f} {:>8} {:>8}{}".format(
+            *key, latency(a), latency(b),
+            "-" if slower is None else "{:+.0%}".format(slower),
+            "-" if bigger is None else "{:+.0%}".format(bigger), flag))
+
+    unmatched = len(set(old) ^ set(new))
+    if unmatched:
+        print("{} result(s) are only in one of the files".format(unmatched))
+
+    print("{} regression(s) over {:.0%}".format(len(regressions), args.threshold))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
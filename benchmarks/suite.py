@@ -0,0 +1,176 @@
+"""
+Times every Graph operation on seeded random geometric, grid and
+hub-and-spoke graphs and writes the results as JSON, for comparing
+commits with benchmarks/compare.py.
+
+For each layout and size it reports calls per second, latency
+percentiles and the tracemalloc peak of a few extra calls. Queries run
+before mutations. minimum_range and find_path start from the graph's
+caches emptied and use a distinct base for every call, so each call
+includes building that base's range index or distances.
+
+python3 -m benchmarks.suite [--sizes 1000 10000 ...] [--layouts grid ...] [--out results.json]
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+
+from benchmarks.common import LAYOUTS, percentile
+
+OPERATIONS = ('find_emergency_range', 'find_path', 'minimum_range',
+              'insert_vertex', 'insert_edge', 'move_vertex', 'remove_vertex')
+
+# Operations that scan a good part of the graph get fewer calls.
+HEAVY = ('find_path', 'minimum_range')
+
+
+def call_arguments(G, vertices, operation, rng, count):
+    # The argument tuples for count calls of operation, drawn before
+    # anything is timed. Bases for minimum_range and find_path, and
+    # vertices for remove_vertex, are all distinct.
+    def position():
+        return rng.uniform(-0.1, 1.1) * scale, rng.uniform(-0.1, 1.1) * scale
+
+    scale = max(max(v.x_pos for v in vertices[:1000]), 1.0)
+
+    if operation == 'find_emergency_range':
+        return [(rng.choice(vertices),) for _ in range(count)]
+    if operation == 'minimum_range':
+        return [(b, rng.choice(vertices)) for b in rng.sample(vertices, count)]
+    if operation == 'find_path':
+        calls = []
+        for b in rng.sample(vertices, count):
+            # A range covering about half the graph, and a target inside it.
+            r = 0.5 * G.find_emergency_range(b)
+            s = rng.choice(vertices)
+            for _ in range(20):
+                if G.distance(b, s) <= r:
+                    break
+                s = rng.choice(vertices)
+            calls.append((b, s, r))
+        return calls
+    if operation == 'insert_vertex':
+        return [position() for _ in range(count)]
+    if operation == 'insert_edge':
+        calls = []
+        while len(calls) < count:
+            u, v = rng.sample(vertices, 2)
+            if not u.has_neighbour(v) and (v, u) not in calls and (u, v) not in calls:
+                calls.append((u, v))
+        return calls
+    if operation == 'move_vertex':
+        return [(rng.choice(vertices),) + position() for _ in range(count)]
+    if operation == 'remove_vertex':
+        return [(v,) for v in rng.sample(vertices, count)]
+    raise ValueError("Unknown operation {}!".format(operation))
+
+
+def measure(G, operation, calls, memory_calls):
+    # Latency of each call, then the peak memory of a few more.
+    method = getattr(G, operation)
+    latencies = []
+    for args in calls:
+        start = time.perf_counter()
+        method(*args)
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    for args in memory_calls:
+        method(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        'calls': len(latencies),
+        'seconds': total,
+        'ops_per_second': len(latencies) / total if total else None,
+        'p50_ms': 1000 * percentile(latencies, 50),
+        'p90_ms': 1000 * percentile(latencies, 90),
+        'p99_ms': 1000 * percentile(latencies, 99),
+        'max_ms': 1000 * latencies[-1],
+        'peak_kib': peak / 1024,
+    }
+
+
+def run_layout(layout, n, seed, light=200, heavy=None):
+    heavy = heavy or max(3, min(50, 200000 // n))
+
+    start = time.perf_counter()
+    G, vertices = LAYOUTS[layout](n, seed)
+    build = time.perf_counter() - start
+    edges = sum(len(v._adjacent) for v in vertices) // 2
+
+    row = {'layout': layout, 'vertices': len(vertices), 'edges': edges, 'seed': seed}
+    yield dict(row, operation='build', calls=1, seconds=build, ops_per_second=1 / build)
+
+    rng = random.Random(seed)
+    for operation in OPERATIONS:
+        count = heavy if operation in HEAVY else light
+        memory_count = 1 if operation in HEAVY else 10
+        args = call_arguments(G, vertices, operation, rng, count + memory_count)
+        if operation in HEAVY:
+            # No base of this operation was queried before.
+            G._range_indexes.clear()
+            G._base_distances.clear()
+        if operation == 'remove_vertex':
+            removed = {a[0] for a in args}
+            vertices = [v for v in vertices if v not in removed]
+
+        result = measure(G, operation, args[:count], args[count:])
+        if operation == 'insert_vertex':
+            vertices = list(G._vertices)
+        yield dict(row, operation=operation, **result)
+
+
+def commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--layouts', nargs='+', choices=sorted(LAYOUTS), default=sorted(LAYOUTS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='benchmark_results.json')
+    args = parser.parse_args()
+
+    results = []
+    print("{:<10} {:>8} {:<21} {:>6} {:>12} {:>9} {:>9} {:>9} {:>10}".format(
+        "layout", "V", "operation", "calls", "ops/s", "p50 ms", "p99 ms", "max ms", "peak KiB"))
+
+    for n in args.sizes:
+        for layout in args.layouts:
+            for result in run_layout(layout, n, args.seed):
+                results.append(result)
+                print("{:<10} {:>8} {:<21} {:>6} {:>12.1f} {:>9.3f} {:>9.3f} {:>9.3f} {:>10.1f}".format(
+                    result['layout'], result['vertices'], result['operation'], result['calls'],
+                    result['ops_per_second'], result.get('p50_ms', result['seconds'] * 1000),
+                    result.get('p99_ms', result['seconds'] * 1000),
+                    result.get('max_ms', result['seconds'] * 1000), result.get('peak_kib', 0)))
+
+    report = {
+        'commit': commit(),
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'results': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=1)
+    print("Wrote {}".format(args.out))
+
+
+if __name__ == '__main__':
+    main()
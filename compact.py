@@ -0,0 +1,211 @@
+import collections
+import heapq
+import math
+import mmap
+import struct
+import sys
+from array import array
+
+inf = float('inf')
+
+# File layout, all little endian: MAGIC, then the vertex count n and the
+# target count m as uint64, then xs and ys as n float64 each, offsets as
+# n + 1 int64 and targets as m int64. Every section is 8 byte aligned.
+MAGIC = b'PEGRAPH1'
+HEADER = struct.Struct('<8sQQ')
+
+
+class CompactGraph:
+    """
+    Read-only graph stored in flat arrays instead of Vertex and Edge objects.
+
+    Vertex i sits at (xs[i], ys[i]) and its neighbours are
+    targets[offsets[i]:offsets[i + 1]] (compressed sparse rows). Queries
+    take and return row numbers. When built from a Graph, ``vertices[i]``
+    is the Vertex that row i came from.
+    """
+
+    def __init__(self, xs, ys, offsets, targets, vertices=None, buffer=None):
+        self.xs = xs
+        self.ys = ys
+        self.offsets = offsets
+        self.targets = targets
+        self.vertices = vertices
+        self._rows = None
+        # The memory map the arrays are views of, when opened from a file
+        self._buffer = buffer
+
+    @classmethod
+    def from_graph(cls, G):
+        vertices = tuple(G._vertices)
+        row = {v: i for i, v in enumerate(vertices)}
+
+        xs = array('d', [v.x_pos for v in vertices])
+        ys = array('d', [v.y_pos for v in vertices])
+        offsets = array('q', [0])
+        targets = array('q')
+        for v in vertices:
+            targets.extend(row[u] for u in v._adjacent)
+            offsets.append(len(targets))
+
+        return cls(xs, ys, offsets, targets, vertices)
+
+    def to_graph(self):
+        # Materialise Vertex and Edge objects, in row order.
+        from graph import Graph
+
+        pairs = ((i, j) for i in range(len(self.xs)) for j in self.neighbours(i) if i < j)
+        return Graph.from_arrays(self.xs, self.ys, pairs)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(self.xs), len(self.targets)))
+            for values, typecode in ((self.xs, 'd'), (self.ys, 'd'),
+                                     (self.offsets, 'q'), (self.targets, 'q')):
+                values = array(typecode, values)
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                values.tofile(f)
+
+    @classmethod
+    def open(cls, path):
+        # Memory maps a file written by save. Nothing is read until a query
+        # touches it, so opening is independent of the graph size.
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, n, m = HEADER.unpack_from(buffer) if len(buffer) >= HEADER.size else (None, 0, 0)
+        if magic != MAGIC or len(buffer) < HEADER.size + 8 * (3 * n + 1 + m):
+            buffer.close()
+            raise ValueError("{} is not a graph file!".format(path))
+
+        view = memoryview(buffer)
+        sections = []
+        start = HEADER.size
+        for count, typecode in ((n, 'd'), (n, 'd'), (n + 1, 'q'), (m, 'q')):
+            section = view[start:start + 8 * count].cast(typecode)
+            if sys.byteorder != 'little':
+                section = array(typecode, section.tobytes())
+                section.byteswap()
+            sections.append(section)
+            start += 8 * count
+
+        return cls(*sections, buffer=buffer)
+
+    def close(self):
+        # Releases the memory map of a graph from open.
+        if self._buffer is not None:
+            for section in (self.xs, self.ys, self.offsets, self.targets):
+                if isinstance(section, memoryview):
+                    section.release()
+            self._buffer.close()
+            self._buffer = None
+
+    def __len__(self):
+        return len(self.xs)
+
+    def row(self, v):
+        # Row number of a Vertex this graph was built from.
+        if self._rows is None:
+            self._rows = {u: i for i, u in enumerate(self.vertices)}
+        return self._rows[v]
+
+    def neighbours(self, i):
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def distance(self, i, j):
+        return math.sqrt((self.xs[j] - self.xs[i])**2 + (self.ys[j] - self.ys[i])**2)
+
+    def find_emergency_range(self, i):
+        xs, ys = self.xs, self.ys
+        x, y = xs[i], ys[i]
+        best = 0
+        for k in range(len(xs)):
+            d = (xs[k] - x)**2 + (ys[k] - y)**2
+            if d > best:
+                best = d
+        return math.sqrt(best)
+
+    def find_path(self, b, s, r):
+        # Same search as Graph.find_path, over rows.
+        if b == s:
+            return [b]
+
+        offsets, targets = self.offsets, self.targets
+        parent = {b: None}
+        storage = collections.deque([b])
+
+        while storage:
+            cursor = storage.popleft()
+            for k in range(offsets[cursor], offsets[cursor + 1]):
+                opposite = targets[k]
+                if opposite in parent or self.distance(opposite, b) > r:
+                    continue
+                parent[opposite] = cursor
+
+                if opposite == s:
+                    path = []
+                    while opposite is not None:
+                        path.append(opposite)
+                        opposite = parent[opposite]
+                    path.reverse()
+                    return path
+                storage.append(opposite)
+
+    def search_tree(self, b, r):
+        # Parent links of the breadth first search from b within range r,
+        # covering every row find_path(b, ., r) can reach.
+        offsets, targets = self.offsets, self.targets
+        parent = {b: None}
+        storage = collections.deque([b])
+
+        while storage:
+            cursor = storage.popleft()
+            for k in range(offsets[cursor], offsets[cursor + 1]):
+                opposite = targets[k]
+                if opposite in parent or self.distance(opposite, b) > r:
+                    continue
+                parent[opposite] = cursor
+                storage.append(opposite)
+
+        return parent
+
+    @staticmethod
+    def tree_path(parent, s):
+        # Path from the root of a search_tree to s, None if s isn't in it.
+        if s not in parent:
+            return None
+        path = []
+        while s is not None:
+            path.append(s)
+            s = parent[s]
+        path.reverse()
+        return path
+
+    def minimum_range(self, b, s):
+        return self.minimum_range_all(b)[s]
+
+    def minimum_range_all(self, b):
+        # Same minimax sweep as Graph.minimum_range_all, as a list by row.
+        offsets, targets = self.offsets, self.targets
+        D = [inf] * len(self.xs)
+        D[b] = 0
+        visited = bytearray(len(self.xs))
+        heap = [(0, b)]
+
+        while heap:
+            d, cursor = heapq.heappop(heap)
+            if visited[cursor]:
+                continue
+            visited[cursor] = 1
+
+            for k in range(offsets[cursor], offsets[cursor + 1]):
+                opposite = targets[k]
+                if visited[opposite]:
+                    continue
+                candidate = max(self.distance(opposite, b), d)
+                if candidate < D[opposite]:
+                    D[opposite] = candidate
+                    heapq.heappush(heap, (candidate, opposite))
+
+        return D
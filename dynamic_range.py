@@ -0,0 +1,110 @@
+import heapq
+import itertools
+import math
+
+inf = float('inf')
+
+
+class RangeTracker:
+    """
+    Keeps minimum_range(b, s) for one base b and every s up to date as the
+    graph changes, instead of recomputing it from scratch.
+
+    Each reachable vertex has a label (its minimum range) and a parent, the
+    neighbour its best path arrives from. A vertex's label only depends on
+    the vertices above it in this parent tree, so when a vertex moves or is
+    removed only its subtree is cleared and relabelled from the vertices
+    around it. A new edge can only lower labels, so it is relaxed outward
+    from its ends.
+    """
+
+    def __init__(self, b):
+        self.base = b
+        # tie breaker for heap entries, vertices can't be ordered
+        self._tie = itertools.count()
+        self.recompute()
+
+    def weight(self, v):
+        b = self.base
+        return math.sqrt((b.x_pos - v.x_pos)**2 + (b.y_pos - v.y_pos)**2)
+
+    def range(self, s):
+        return self.labels.get(s, inf)
+
+    def recompute(self):
+        self.labels = {}
+        self.parent = {}
+        self.children = {}
+        self._relax([(0, next(self._tie), self.base, None)])
+
+    def edge_inserted(self, u, v):
+        heap = []
+        for a, c in ((u, v), (v, u)):
+            if a in self.labels:
+                heap.append((max(self.weight(c), self.labels[a]), next(self._tie), c, a))
+        heapq.heapify(heap)
+        self._relax(heap)
+
+    def vertices_changed(self, changed, removed=()):
+        # changed: vertices that moved, removed: vertices no longer in the
+        # graph. Both must already be in their new state.
+        if self.base in changed:
+            self.recompute()
+            return
+
+        # Everything below a changed vertex in the parent tree loses its label.
+        stale = []
+        for x in list(changed) + list(removed):
+            if x in self.labels:
+                self._detach(x)
+                stale.append(x)
+        cleared = set()
+        while stale:
+            x = stale.pop()
+            cleared.add(x)
+            del self.labels[x]
+            stale.extend(self.children.pop(x, ()))
+            self.parent.pop(x, None)
+
+        removed = set(removed)
+        cleared -= removed
+
+        # Relabel the cleared vertices from their neighbours that kept a
+        # label. Labels outside the cleared subtrees stay valid and can
+        # only drop, which relaxing from the relabelled vertices takes
+        # care of.
+        heap = []
+        for x in cleared:
+            for z in x._adjacent:
+                if z in self.labels:
+                    heap.append((max(self.weight(x), self.labels[z]), next(self._tie), x, z))
+
+        heapq.heapify(heap)
+        self._relax(heap)
+
+    def _detach(self, x):
+        p = self.parent.get(x)
+        if p is not None:
+            self.children[p].discard(x)
+
+    def _relax(self, heap):
+        # Minimax Dijkstra from the seeded (label, tie, vertex, parent)
+        # entries. Labels already present are valid upper bounds and are
+        # only ever lowered.
+        labels = self.labels
+
+        while heap:
+            d, _, x, p = heapq.heappop(heap)
+            if d >= labels.get(x, inf):
+                continue
+
+            self._detach(x)
+            labels[x] = d
+            self.parent[x] = p
+            if p is not None:
+                self.children.setdefault(p, set()).add(x)
+
+            for z in x._adjacent:
+                candidate = max(self.weight(z), d)
+                if candidate < labels.get(z, inf):
+                    heapq.heappush(heap, (candidate, next(self._tie), z, x))
@@ -5,15 +5,24 @@
 # e = Edge(v, u)
 
 class Edge:
+    __slots__ = ('u', 'v')
+
     def __init__(self, u, v):
         self.u = u
         self.v = v
 
+    @property
+    def key(self):
+        # Same for both directions: the smaller vertex id first.
+        u, v = self.u.id, self.v.id
+        return (u, v) if u <= v else (v, u)
+
     def __eq__(self, other): 
         # Overrides equality of two edge 
-        # If it's the same class, then it should have the same vertices.
+        # If it's the same class, then it should have the same vertices,
+        # in either order. Vertices compare by identity.
         if isinstance(other, Edge):
-            return (other.u == self.v or other.u == self.u) and (other.v == self.u or other.v == self.v)
+            return (self.u is other.u and self.v is other.v) or (self.u is other.v and self.v is other.u)
 
         # If it's not the same class, it's not equal
         return False
@@ -22,4 +31,6 @@ class Edge:
         return "<{}-{}>".format(self.u, self.v)
 
     def __hash__(self): 
-        return hash(repr(self))
+        # The key packed into one int, without building the tuple.
+        u, v = self.u.id, self.v.id
+        return hash((u << 32) | v if u <= v else (v << 32) | u)
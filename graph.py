@@ -1,8 +1,24 @@
 import math
 import collections
+import threading
 
 from vertex import Vertex
 from edge import Edge
+from hull import convex_hull, inside_hull, farthest_squared
+from range_index import RangeIndex
+from compact import CompactGraph
+from snapshot import GraphSnapshot
+from spatial import GridIndex
+from dynamic_range import RangeTracker
+import batch
+import instrument
+
+# NumPy is optional, without it the coordinate store is skipped and the
+# hull is built and queried with plain loops.
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 inf = float('inf')
 
@@ -10,37 +26,351 @@ class EdgeAlreadyExists(Exception):
     def __init__(self, message):
         super().__init__(message)
 
+# A ValueError, which remove_vertex raised before this existed.
+class VertexNotInGraph(ValueError):
+    def __init__(self, message):
+        super().__init__(message)
+
 class Graph:
     def __init__(self):
         self._vertices = []
 
+        # Position of each vertex in self._vertices
+        self._slots = {}
+
+        # RangeIndex per base, least recently used first. Holds at most
+        # range_cache_size bases, and each change drops the ones it affects.
+        self.range_cache_size = 64
+        self._range_indexes = collections.OrderedDict()
+
+        # Squared distance from each recently used base to the vertices
+        # measured so far, shared by find_path and range_index. Entries of
+        # moved and removed vertices are dropped.
+        self.distance_cache_size = 8
+        self._base_distances = collections.OrderedDict()
+
+        # RangeTracker per tracked base, repaired rather than dropped
+        self._trackers = {}
+
+        # Row i holds the coordinates of self._vertices[i]. Allocated with
+        # spare capacity so inserts don't copy the whole array.
+        self._coords = np.empty((16, 2)) if np is not None else None
+
+        # Convex hull of the vertex positions, None when it needs rebuilding
+        self._set_hull([])
+
+        # (x_pos, y_pos) -> a vertex at that position, with any further
+        # vertices sharing the position in self._stacked
+        self._positions = {}
+        self._stacked = {}
+
+        # GridIndex for stations_within and nearest_station, built on the
+        # first such query and then kept up to date
+        self._grid = None
+        self._grid_built = 0
+
+        # Bumped by every change. The last snapshot taken, and the vertices
+        # changed since (None when the next snapshot should start over).
+        self._version = 0
+        self._snapshot = None
+        self._dirty = None
+
+        # Instrumentation while instrument() is on, otherwise None
+        self.instrumentation = None
+
+        # Queries may run on several threads at once (see service.py), and
+        # some of them update the caches above: the LRU order, evictions and
+        # the lazy hull rebuild happen under this lock. Mutations must not
+        # overlap queries.
+        self._cache_lock = threading.Lock()
+
+    def _invalidate(self, changed=(), edges=(), unlinked=()):
+        # Called by every method that changes vertices, edges or positions,
+        # with the vertices that were added, moved or removed, the (u, v)
+        # edges that were added, and the vertices that only lost edges to
+        # removed ones. Those can't change any cached range or distance,
+        # since the removed vertex is reachable whenever they are, but
+        # snapshots still need to see them.
+        self._version += 1
+
+        if self._base_distances and changed:
+            for v in changed:
+                self._base_distances.pop(v, None)
+            for squared in self._base_distances.values():
+                for v in changed:
+                    squared.pop(v, None)
+
+        if self._range_indexes:
+            stale = [b for b, index in self._range_indexes.items() if not index.survives(changed, edges)]
+            for b in stale:
+                del self._range_indexes[b]
+
+        if self._dirty is not None:
+            self._dirty.update(changed)
+            self._dirty.update(unlinked)
+            for u, v in edges:
+                self._dirty.update((u, v))
+            if len(self._dirty) > len(self._vertices) // 2:
+                self._dirty = None
+
+    @classmethod
+    def from_arrays(cls, xs, ys, edge_pairs):
+        # Builds the same graph as inserting vertex (xs[i], ys[i]) for every
+        # i and then an edge for every (i, j) pair, skipping repeated pairs.
+        G = cls()
+        vertices = G.insert_vertices(xs, ys)
+        n = len(vertices)
+
+        def pairs():
+            for i, j in edge_pairs:
+                if not (0 <= i < n and 0 <= j < n):
+                    raise VertexNotInGraph("Edge ({}, {}) refers to a missing vertex!".format(i, j))
+                yield vertices[i], vertices[j]
+
+        G.bulk_insert_edges(pairs())
+        return G
+
+    def insert_vertices(self, xs, ys):
+        # insert_vertex for every (xs[i], ys[i]), growing the coordinate
+        # store once and leaving the hull to be rebuilt on the next query.
+        # Returns the new vertices in order.
+        if len(xs) != len(ys):
+            raise ValueError("xs and ys must have the same length!")
+
+        vertices = [Vertex(x, y) for x, y in zip(xs, ys)]
+        start = len(self._vertices)
+        self._vertices.extend(vertices)
+        for i, v in enumerate(vertices, start):
+            self._slots[v] = i
+            v._graph = self
+            self._index_position(v)
+
+        if self._coords is not None and vertices:
+            self._reserve_coords(len(self._vertices))
+            self._coords[start:len(self._vertices)] = [(v.x_pos, v.y_pos) for v in vertices]
+
+        if vertices:
+            self._hull = None
+        self._invalidate(vertices)
+        return vertices
+
+    def _reserve_coords(self, n):
+        # Make room for n coordinate rows, doubling the capacity as needed.
+        if n > len(self._coords):
+            grown = np.empty((max(n, 2 * len(self._coords)), 2))
+            grown[:len(self._coords)] = self._coords
+            self._coords = grown
+
     def insert_vertex(self, x_pos, y_pos):
         v = Vertex(x_pos, y_pos)
+        v._graph = self
+        self._slots[v] = len(self._vertices)
         self._vertices.append(v)
+        self._index_position(v)
+
+        if self._coords is not None:
+            n = len(self._vertices)
+            self._reserve_coords(n)
+            self._coords[n - 1] = (x_pos, y_pos)
+
+        self._hull_add(v)
+        self._invalidate((v,))
         return v
 
     def insert_edge(self, u, v):
         e = Edge(u, v)
 
         # Check that the edge doesn't already exist
-        for i in u.edges:
-            if i == e:
-                # Edge already exists.
-                raise EdgeAlreadyExists("Edge already exists between vertex!")
+        if u.has_neighbour(v):
+            raise EdgeAlreadyExists("Edge already exists between vertex!")
 
         # Add the edge to both nodes.
         u.add_edge(e)
         v.add_edge(e)
+        self._invalidate(edges=((u, v),))
+
+        for tracker in self._trackers.values():
+            tracker.edge_inserted(u, v)
+
+    def bulk_insert_edges(self, pairs):
+        # insert_edge for every (u, v) pair, skipping pairs that are already
+        # linked instead of raising. Returns how many edges were added.
+        added = 0
+        # Only needed when something is there to be told about them.
+        added_edges = [] if self._dirty is not None or self._range_indexes else None
+        try:
+            for u, v in pairs:
+                if u not in self._slots or v not in self._slots:
+                    raise VertexNotInGraph("Edge ({}, {}) refers to a missing vertex!".format(u, v))
+                if u.has_neighbour(v):
+                    continue
+
+                e = Edge(u, v)
+                u._adjacent[v] = e
+                v._adjacent[u] = e
+                added += 1
+                if added_edges is not None:
+                    added_edges.append((u, v))
+
+                for tracker in self._trackers.values():
+                    tracker.edge_inserted(u, v)
+        finally:
+            # Edges added before a bad pair stay, so drop the caches anyway.
+            if added:
+                self._invalidate(edges=added_edges or ())
+        return added
 
     def remove_vertex(self, v):
-        # Remove it from the list
-        del self._vertices[self._vertices.index(v)]
+        if v not in self._slots:
+            raise VertexNotInGraph("Vertex is not in the graph!")
+        self.remove_vertices((v,))
+
+    def remove_vertices(self, vs):
+        # remove_vertex for a burst of vertices, updating the caches,
+        # trackers and indexes once for all of them. Nothing is removed if
+        # any of them isn't in the graph.
+        removed = list(dict.fromkeys(vs))
+        for v in removed:
+            if v not in self._slots:
+                raise VertexNotInGraph("Vertex {} is not in the graph!".format(v))
+        if not removed:
+            return
+
+        # Rebuild the grid later rather than emptying most of it.
+        if 2 * len(removed) > len(self._vertices):
+            self._grid = None
+
+        gone = set(removed)
+        unlinked = []
+        for v in removed:
+            # Remove it from the list by moving the last vertex into its
+            # slot, and the same for its coordinate row.
+            i = self._slots.pop(v)
+            v._graph = None
+            last = self._vertices.pop()
+            if last is not v:
+                self._vertices[i] = last
+                self._slots[last] = i
+                if self._coords is not None:
+                    self._coords[i] = self._coords[len(self._vertices)]
+
+            self._hull_discard(v)
+            self._unindex_position(v)
+
+            # Go through and remove all edges from that node. Neighbours
+            # being removed as well are cleared in their own turn.
+            for u in v._adjacent:
+                if u not in gone:
+                    del u._adjacent[v]
+                    unlinked.append(u)
+            v._adjacent.clear()
+
+        self._invalidate(removed, unlinked=unlinked)
+
+        for v in removed:
+            self._trackers.pop(v, None)
+        for tracker in self._trackers.values():
+            tracker.vertices_changed((), removed)
+
+    def _index_position(self, v):
+        key = (v.x_pos, v.y_pos)
+        if key in self._positions:
+            self._stacked.setdefault(key, []).append(v)
+        else:
+            self._positions[key] = v
+
+        if self._grid is not None:
+            self._grid.add(v)
+
+    def _unindex_position(self, v):
+        key = (v.x_pos, v.y_pos)
+        stacked = self._stacked.get(key)
+        if self._positions[key] is v:
+            if stacked:
+                self._positions[key] = stacked.pop()
+            else:
+                del self._positions[key]
+        else:
+            stacked.remove(v)
+        if stacked is not None and not stacked:
+            del self._stacked[key]
+
+        if self._grid is not None:
+            self._grid.remove(v)
+
+    def vertex_at(self, x_pos, y_pos):
+        # A vertex at exactly this position, or None.
+        return self._positions.get((x_pos, y_pos))
+
+    def _spatial_grid(self):
+        # Rebuilt when the vertex count drifts far from the one the cell
+        # size was chosen for, aiming for about one vertex per cell.
+        n = len(self._vertices)
+        if self._grid is None or n > 4 * self._grid_built or 4 * n < self._grid_built:
+            cell = 0
+            if n:
+                xs = [v.x_pos for v in self._vertices]
+                ys = [v.y_pos for v in self._vertices]
+                width, height = max(xs) - min(xs), max(ys) - min(ys)
+                # The second term keeps long thin layouts from getting
+                # tiny cells.
+                cell = max(math.sqrt(width * height / n), max(width, height) / n)
+            self._grid = GridIndex(cell or 1.0, self._vertices)
+            self._grid_built = max(n, 1)
+        return self._grid
+
+    def stations_within(self, v, r):
+        # Every other station at most r away from v.
+        return [u for u in self._spatial_grid().within(v.x_pos, v.y_pos, r)
+                if u is not v and self.distance(u, v) <= r]
+
+    def nearest_station(self, x_pos, y_pos):
+        # The station closest to (x_pos, y_pos), None if there are none.
+        return self._spatial_grid().nearest(x_pos, y_pos)
+
+    def compact(self):
+        # Array backed, read-only copy of the graph (see compact.py).
+        return CompactGraph.from_graph(self)
+
+    def save(self, path):
+        # Writes the graph in the binary format described in compact.py.
+        self.compact().save(path)
+
+    @staticmethod
+    def open(path):
+        # Memory maps a file written by save. Returns a CompactGraph that
+        # answers queries on row numbers straight away; call to_graph() on
+        # it for Vertex and Edge objects.
+        return CompactGraph.open(path)
+
+    def snapshot(self):
+        # Immutable view of the graph as it is now, sharing the chunks of
+        # unchanged vertices with the previous snapshot (see snapshot.py).
+        if self._snapshot is None or self._snapshot.version != self._version:
+            self._snapshot = GraphSnapshot.capture(self, self._snapshot, self._dirty)
+            self._dirty = set()
+        return self._snapshot
+
+    def instrument(self):
+        # Start counting and timing operations, see instrument.py.
+        if self.instrumentation is None:
+            self.instrumentation = instrument.Instrumentation()
+            self.instrumentation.attach(self)
+        return self.instrumentation
+
+    def uninstrument(self):
+        if self.instrumentation is not None:
+            self.instrumentation.detach(self)
+            self.instrumentation = None
 
-        # Go through and remove all edges from that node.
-        while len(v.edges) != 0:
-            e = v.edges.pop()
-            u = self.opposite(e, v)
-            u.remove_edge(e)
+    def profile(self, kind='cprofile'):
+        # with G.profile() as p: ... runs the block under cProfile (or
+        # tracemalloc) and keeps the block's own instrumentation in p.
+        return instrument.profile(self, kind)
+
+    def run_queries(self, queries, processes=None):
+        # Answers a batch of query tuples on a process pool, see batch.py.
+        return batch.run_queries(self, queries, processes)
 
     @staticmethod
     def distance(u, v):
@@ -59,38 +389,246 @@ class Graph:
         return e.u
 
     def find_emergency_range(self, v):
-        max = self.distance(v, v)
-        for u in self._vertices:
-            if (self.distance(u, v)) > max:
-                max = self.distance(u, v)
-        return max
+        # The furthest vertex is always on the convex hull, so only the
+        # hull needs scanning. Squared distances, one sqrt at the end.
+        return math.sqrt(farthest_squared(self._current_hull(), v.x_pos, v.y_pos))
+
+    def find_emergency_ranges(self, vs):
+        # find_emergency_range for many stations at once.
+        hull = self._current_hull()
+        if np is None or not hull:
+            return [self.find_emergency_range(v) for v in vs]
+
+        sources = np.array([(v.x_pos, v.y_pos) for v in vs], dtype=float).reshape(-1, 2)
+        dx = self._hull_coords[None, :, 0] - sources[:, 0, None]
+        dy = self._hull_coords[None, :, 1] - sources[:, 1, None]
+        return np.sqrt((dx * dx + dy * dy).max(axis=1)).tolist()
+
+    def _current_hull(self):
+        # Rebuilt lazily after a hull vertex moved or was removed.
+        if self._hull is None:
+            with self._cache_lock:
+                if self._hull is None:
+                    self._rebuild_hull()
+        return self._hull
+
+    def _rebuild_hull(self):
+        candidates = self._vertices
+        n = len(self._vertices)
+
+        # Akl-Toussaint: points strictly inside the quadrilateral of the
+        # leftmost, lowest, rightmost and highest points can't be on the hull.
+        if self._coords is not None and n > 64:
+            xs = self._coords[:n, 0]
+            ys = self._coords[:n, 1]
+            corners = [xs.argmin(), ys.argmin(), xs.argmax(), ys.argmax()]
+            inside = np.ones(n, dtype=bool)
+            for a, b in zip(corners, corners[1:] + corners[:1]):
+                inside &= (xs[b] - xs[a]) * (ys - ys[a]) - (ys[b] - ys[a]) * (xs - xs[a]) > 0
+            candidates = [self._vertices[i] for i in np.flatnonzero(~inside)]
+
+        self._set_hull(convex_hull(candidates))
+
+    def _set_hull(self, hull):
+        # The hull last, so a query seeing it also sees its members and
+        # coordinates.
+        self._hull_members = set(hull)
+        if np is not None:
+            self._hull_coords = np.array([(u.x_pos, u.y_pos) for u in hull], dtype=float)
+        self._hull = hull
+
+    def _hull_add(self, v):
+        # v now sits at its position, grow the hull if it falls outside.
+        if self._hull is None or inside_hull(self._hull, v.x_pos, v.y_pos):
+            return
+        self._set_hull(convex_hull(self._hull + [v]))
 
-    def find_path(self, b, s, r):
-        # distance from B to every vertex S in the path is within r
+    def _hull_discard(self, v):
+        # Losing a hull vertex may expose interior points, rebuild on demand.
+        if self._hull is not None and v in self._hull_members:
+            self._hull = None
+
+    def find_path(self, b, s, r, bidirectional=False):
+        # distance from B to every vertex S in the path is within r.
+        # bidirectional searches from both ends, which looks at far fewer
+        # stations when s is close to b compared to r.
 
         if b == None or s == None:
             return 
 
-        # initialize
-        path = [b]
-        storage = [path]
+        if b == s:
+            return [b]
+
+        # s itself has to be in range. Written so a NaN range fails too.
+        if not self.distance(s, b) <= r:
+            return
+
+        # Don't search when an existing index already knows s is out of range.
+        index = self._range_indexes.get(b)
+        if index is not None and not index.is_reachable(s, r):
+            return
+
+        if bidirectional:
+            return self._find_path_bidirectional(b, s, r)
+
+        # Breadth first search, so the first time s is reached is along a
+        # path with the fewest hops. Each vertex remembers who reached it
+        # and the path is only built once s is found.
+        parent = {b: None}
+        storage = collections.deque([b])
+        squared, known = self._squared_distances(b)
+        low, high = self._square_band(r)
+        bx, by = b.x_pos, b.y_pos
+
+        while storage:
+            cursor = storage.popleft()
+
+            for opposite in cursor._adjacent:
+                if opposite in parent:
+                    continue
+                # distance(opposite, b) > r, on cached squared distances
+                d2 = squared.get(opposite)
+                if d2 is None:
+                    d2 = squared[opposite] = (opposite.x_pos - bx)**2 + (opposite.y_pos - by)**2
+                if d2 > low and (d2 > high or math.sqrt(d2) > r):
+                    continue
+                parent[opposite] = cursor
 
-        while path and storage:
-            path = storage.pop(0)
-            cursor = path[-1]
+                if opposite == s:
+                    if self.instrumentation is not None:
+                        self.instrumentation.search('find_path', (parent,), list(storage) + [s],
+                                                    len(squared) - known)
+                    return self._build_path(parent, opposite)
+                storage.append(opposite)
 
-            # base case
-            if cursor == s:
+        if self.instrumentation is not None:
+            self.instrumentation.search('find_path', (parent,), (), len(squared) - known)
+
+    def _find_path_bidirectional(self, b, s, r):
+        # Breadth first search from b and from s, expanding a whole layer of
+        # the smaller frontier at a time. The searches meet when a vertex
+        # finds a neighbour the other side has reached; the rest of that
+        # layer is still checked for a meeting closer to the other end, so
+        # the joined path has the fewest hops. Both sides only enter
+        # vertices within r of b.
+        parents = ({b: None}, {s: None})
+        depths = ({b: 0}, {s: 0})
+        frontiers = ([b], [s])
+        squared, known = self._squared_distances(b)
+        low, high = self._square_band(r)
+        bx, by = b.x_pos, b.y_pos
+
+        while frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            parent, depth = parents[side], depths[side]
+            other_parent, other_depth = parents[1 - side], depths[1 - side]
+
+            layer = []
+            best = None
+            for cursor in frontiers[side]:
+                for opposite in cursor._adjacent:
+                    if opposite in parent:
+                        continue
+                    if opposite in other_parent:
+                        if best is None or other_depth[opposite] < best[0]:
+                            best = (other_depth[opposite], cursor, opposite)
+                        continue
+                    d2 = squared.get(opposite)
+                    if d2 is None:
+                        d2 = squared[opposite] = (opposite.x_pos - bx)**2 + (opposite.y_pos - by)**2
+                    if d2 > low and (d2 > high or math.sqrt(d2) > r):
+                        continue
+                    parent[opposite] = cursor
+                    depth[opposite] = depth[cursor] + 1
+                    layer.append(opposite)
+
+            if best is not None:
+                if self.instrumentation is not None:
+                    self.instrumentation.search('find_path', parents, layer + frontiers[1 - side],
+                                                len(squared) - known)
+                _, cursor, opposite = best
+                half = self._build_path(parent, cursor)
+                rest = self._build_path(other_parent, opposite)
+                rest.reverse()
+                path = half + rest
+                if side == 1:
+                    path.reverse()
                 return path
 
-            # recursive case
-            for edge in cursor.edges:
-                opposite = self.opposite(edge, cursor)
+            frontiers = (layer, frontiers[1]) if side == 0 else (frontiers[0], layer)
+
+        if self.instrumentation is not None:
+            self.instrumentation.search('find_path', parents, frontiers[0] + frontiers[1],
+                                        len(squared) - known)
+
+    def range_index(self, b):
+        # Smallest range reaching each station from b, built once per base
+        # and kept until a change affects it or it falls out of the cache.
+        with self._cache_lock:
+            index = self._range_indexes.get(b)
+            if index is not None:
+                self._range_indexes.move_to_end(b)
+        if self.instrumentation is not None:
+            self.instrumentation.cache('range_index', index is not None)
+        if index is not None:
+            return index
 
-                if self.distance(opposite, b) <= r and opposite not in path:
-                    new_path = list(path)
-                    new_path.append(opposite)
-                    storage.append(new_path)
+        # Built outside the lock, so other bases don't wait. Two threads
+        # may build the same index, which is harmless.
+        squared, known = self._squared_distances(b)
+        index = RangeIndex(b, self._vertices, squared)
+        with self._cache_lock:
+            self._range_indexes[b] = index
+            while len(self._range_indexes) > max(self.range_cache_size, 1):
+                self._range_indexes.popitem(last=False)
+        if self.instrumentation is not None:
+            self.instrumentation.index_built(self._vertices, len(squared) - known)
+        return index
+
+    def _squared_distances(self, b):
+        # The cached squared distances from b, for the caller to fill in,
+        # and how many it holds already. Concurrent callers only ever add
+        # the same values.
+        with self._cache_lock:
+            squared = self._base_distances.get(b)
+            if squared is None:
+                squared = self._base_distances[b] = {}
+                while len(self._base_distances) > max(self.distance_cache_size, 1):
+                    self._base_distances.popitem(last=False)
+            else:
+                self._base_distances.move_to_end(b)
+            return squared, len(squared)
+
+    @staticmethod
+    def _square_band(r):
+        # Squared distances at most low are within r and those above high
+        # are not. r * r is rounded, so in between the square root is taken
+        # to get exactly the answer distance() would give.
+        return r * r * (1 - 1e-9), r * r * (1 + 1e-9)
+
+    def can_reach(self, b, s, r):
+        # Whether find_path(b, s, r) would find a path, without searching.
+        return self.range_index(b).is_reachable(s, r)
+
+    def reachable_stations(self, b, r):
+        # Every station find_path can reach from b with range r.
+        return self.range_index(b).reachable(r)
+
+    def coverage_curve(self, b, ranges):
+        # How many and which stations find_path can reach from b at each
+        # of the candidate ranges. One union-find sweep (the range index)
+        # answers every range with a binary search.
+        return self.range_index(b).coverage_curve(ranges)
+
+    @staticmethod
+    def _build_path(parent, v):
+        # Follow parent pointers back to the vertex whose parent is None.
+        path = []
+        while v is not None:
+            path.append(v)
+            v = parent[v]
+        path.reverse()
+        return path
 
     def minimum_range(self, b, s):
         # minimum range in the path to go from vertex B to vertex S
@@ -98,35 +636,136 @@ class Graph:
         if b == None or s == None: 
             return 
 
-        # if b == s: 
-        #     return D[s]
+        tracker = self._trackers.get(b)
+        if tracker is not None:
+            return tracker.range(s)
+
+        # The range index holds exactly this: the smallest range at which
+        # s is connected to b through stations no further away.
+        return self.range_index(b).threshold(s)
+
+    def minimum_range_all(self, b):
+        # minimum range from b to every vertex in the graph, in one sweep.
+        # Unreachable vertices get inf.
 
-        # initialize algorithm
-        D = {vertex: inf for vertex in self._vertices}
-        D[b] = 0
-        vertices = self._vertices.copy()
-        visited = []
+        if b == None:
+            return
 
-        # iteratively add vertices to S
-        while vertices:
-            cursor = min(vertices, key = lambda vertex : D[vertex])
-            visited.append(cursor)
+        tracker = self._trackers.get(b)
+        if tracker is not None:
+            D = tracker.labels
+            return {vertex: D.get(vertex, inf) for vertex in self._vertices}
 
-            if D[cursor] == inf: 
-                break 
+        threshold = self.range_index(b).threshold
+        return {vertex: threshold(vertex) for vertex in self._vertices}
 
-            for edge in cursor.edges:
-                opposite = self.opposite(edge, cursor)
+    def track_minimum_range(self, b):
+        # Keep minimum ranges from b up to date through moves, edge inserts
+        # and removals, repairing only what each change affects.
+        if b not in self._trackers:
+            self._trackers[b] = RangeTracker(b)
+        return self._trackers[b]
 
-                if max(self.distance(opposite, b), D[cursor]) <= D[opposite] and opposite not in visited:
-                    D[opposite] = max(self.distance(opposite, b), D[cursor])
-            
-            vertices.remove(cursor)
-        return D[s]
+    def untrack_minimum_range(self, b):
+        self._trackers.pop(b, None)
 
     def move_vertex(self, v, new_x, new_y):
         # If there is already a vertex there, do nothing.
-        for vertex in self._vertices:
-            if vertex.x_pos == new_x and vertex.y_pos == new_y: 
-                return 
-        v.move_vertex(new_x, new_y)
+        if (new_x, new_y) in self._positions:
+            return 
+
+        row = self._slots.get(v)
+        if row is None:
+            # Not in this graph, there is nothing to keep in step.
+            v.move_vertex(new_x, new_y)
+            return
+
+        self._hull_discard(v)
+        self._unindex_position(v)
+        v._place(new_x, new_y)
+        self._index_position(v)
+
+        if self._coords is not None:
+            self._coords[row] = (new_x, new_y)
+        self._hull_add(v)
+        self._invalidate((v,))
+
+        for tracker in self._trackers.values():
+            tracker.vertices_changed((v,))
+
+    def move_vertices(self, updates):
+        # move_vertex for a batch of (v, new_x, new_y) updates, applied
+        # together. An update is rejected when its vertex isn't in the
+        # graph or already moved earlier in the batch, or when its target
+        # ends up occupied: by a station that stays put, or by an earlier
+        # update in the batch. Returns the rejected updates.
+        rejected = []
+        accepted = {}
+        for update in updates:
+            v, new_x, new_y = update
+            if v not in self._slots or v in accepted:
+                rejected.append(update)
+            else:
+                accepted[v] = update
+
+        # The first update onto a position claims it.
+        claims = {}
+        for v, update in list(accepted.items()):
+            target = (update[1], update[2])
+            if target in claims:
+                rejected.append(update)
+                del accepted[v]
+            else:
+                claims[target] = v
+
+        # A rejected update leaves its vertex where it was, which blocks
+        # the update claiming that position, if there is one. Following
+        # those chains touches every update at most once.
+        blocked = [v for target, v in claims.items()
+                   if v in accepted and self._occupied_by_other(target, accepted)]
+        while blocked:
+            v = blocked.pop()
+            if v not in accepted:
+                continue
+            rejected.append(accepted.pop(v))
+            u = claims.get((v.x_pos, v.y_pos))
+            if u is not None and u in accepted:
+                blocked.append(u)
+
+        if not accepted:
+            return rejected
+
+        # Rebuild the grid and hull from scratch later rather than
+        # patching them for most of the graph.
+        if 2 * len(accepted) > len(self._vertices):
+            self._grid = None
+        if self._hull is not None and len(accepted) > len(self._hull):
+            self._hull = None
+
+        # Take every mover out of the indexes before putting any back, as
+        # they may be swapping positions.
+        for v in accepted:
+            self._hull_discard(v)
+            self._unindex_position(v)
+
+        for v, (_, new_x, new_y) in accepted.items():
+            v._place(new_x, new_y)
+            self._index_position(v)
+            if self._coords is not None:
+                self._coords[self._slots[v]] = (new_x, new_y)
+            self._hull_add(v)
+
+        self._invalidate(accepted)
+
+        for tracker in self._trackers.values():
+            tracker.vertices_changed(accepted)
+        return rejected
+
+    def _occupied_by_other(self, position, moving):
+        # Whether a vertex that isn't in moving sits at position.
+        v = self._positions.get(position)
+        if v is None:
+            return False
+        if v not in moving:
+            return True
+        return any(u not in moving for u in self._stacked.get(position, ()))
@@ -0,0 +1,66 @@
+# Convex hull helpers used by Graph to answer farthest-station queries.
+# The farthest point of a set from any location is always a hull vertex.
+
+
+def cross(o, a, b):
+    # > 0 if o -> a -> b turns counter-clockwise, 0 if collinear
+    return (a.x_pos - o.x_pos) * (b.y_pos - o.y_pos) - \
+        (a.y_pos - o.y_pos) * (b.x_pos - o.x_pos)
+
+
+def convex_hull(vertices):
+    """
+    Andrew's monotone chain. Returns the hull vertices in counter-clockwise
+    order without collinear points.
+    """
+
+    points = sorted(vertices, key=lambda v: (v.x_pos, v.y_pos))
+    if len(points) <= 2:
+        return points
+
+    lower = []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+
+    upper = []
+    for p in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+
+    hull = lower[:-1] + upper[:-1]
+
+    # Every point shared one position.
+    if not hull:
+        return points[:1]
+    return hull
+
+
+def inside_hull(hull, x_pos, y_pos):
+    """
+    True if (x_pos, y_pos) lies inside or on the boundary of a
+    counter-clockwise hull with at least three vertices.
+    """
+
+    if len(hull) < 3:
+        return False
+
+    for i in range(len(hull)):
+        a = hull[i]
+        b = hull[(i + 1) % len(hull)]
+        if (b.x_pos - a.x_pos) * (y_pos - a.y_pos) - \
+                (b.y_pos - a.y_pos) * (x_pos - a.x_pos) < 0:
+            return False
+    return True
+
+
+def farthest_squared(hull, x_pos, y_pos):
+    # Largest squared distance from (x_pos, y_pos) to a hull vertex.
+    best = 0
+    for u in hull:
+        d = (u.x_pos - x_pos)**2 + (u.y_pos - y_pos)**2
+        if d > best:
+            best = d
+    return best
@@ -0,0 +1,159 @@
+"""
+Streams station surveys from CSV or JSONL files into a Graph without
+reading the whole file into memory.
+
+CSV rows are either ``x,y`` (a station) or ``x1,y1,x2,y2`` (a link
+between the stations at those positions, created if missing). A header
+row is allowed. JSONL lines are either {"x": .., "y": ..} or
+{"from": [x1, y1], "to": [x2, y2]}.
+
+Rows are parsed lazily and handed to the graph in chunks: positions are
+looked up through the graph's position index, new stations of a chunk
+are inserted together through insert_vertices and links go through bulk_insert_edges, which
+drops links that already exist. Rows that can't be parsed are skipped
+and counted.
+"""
+
+import csv
+import json
+import math
+import time
+
+
+class IngestStats:
+    def __init__(self):
+        self.rows = 0
+        self.stations = 0
+        self.links = 0
+        self.duplicate_links = 0
+        self.malformed = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return ("IngestStats(rows={}, stations={}, links={}, duplicate_links={}, "
+                "malformed={}, rows_per_second={:.0f})").format(
+                    self.rows, self.stations, self.links, self.duplicate_links,
+                    self.malformed, self.rows_per_second)
+
+
+def _coordinates(values):
+    # Finite floats, or None when any value isn't one.
+    try:
+        numbers = tuple(float(v) for v in values)
+    except (TypeError, ValueError):
+        return None
+    if not all(math.isfinite(v) for v in numbers):
+        return None
+    return numbers
+
+
+def read_csv(path):
+    # Yields a tuple of 2 or 4 coordinates per row, None for a bad row.
+    with open(path, newline='') as f:
+        for line, row in enumerate(csv.reader(f)):
+            if not row:
+                continue
+            values = _coordinates(row) if len(row) in (2, 4) else None
+            if values is None and line == 0:
+                # header
+                continue
+            yield values
+
+
+def read_jsonl(path):
+    # Yields a tuple of 2 or 4 coordinates per line, None for a bad line.
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if 'from' in record:
+                    values = _coordinates(list(record['from']) + list(record['to']))
+                    if values is not None and len(values) != 4:
+                        values = None
+                else:
+                    values = _coordinates((record['x'], record['y']))
+            except (ValueError, KeyError, TypeError):
+                values = None
+            yield values
+
+
+def ingest(G, rows, chunk_size=10000, report=None):
+    """
+    Adds stations and links to G.
+    :param G: The graph.
+    :param rows: Iterable of coordinate tuples (or None for bad rows), as
+                 produced by read_csv and read_jsonl.
+    :param chunk_size: Rows held in memory at once.
+    :param report: Optional callable given the IngestStats after each chunk.
+    :return: IngestStats
+    """
+
+    stats = IngestStats()
+    start = time.perf_counter()
+    chunk = []
+
+    for row in rows:
+        stats.rows += 1
+        if row is None:
+            stats.malformed += 1
+            continue
+
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            _add_chunk(G, chunk, stats)
+            chunk = []
+            stats.seconds = time.perf_counter() - start
+            if report is not None:
+                report(stats)
+
+    if chunk:
+        _add_chunk(G, chunk, stats)
+    stats.seconds = time.perf_counter() - start
+    if report is not None:
+        report(stats)
+    return stats
+
+
+def ingest_file(G, path, chunk_size=10000, report=None):
+    # ingest for a .csv or .jsonl file.
+    if path.endswith('.jsonl'):
+        rows = read_jsonl(path)
+    elif path.endswith('.csv'):
+        rows = read_csv(path)
+    else:
+        raise ValueError("Don't know how to read {}!".format(path))
+    return ingest(G, rows, chunk_size, report)
+
+
+def _add_chunk(G, chunk, stats):
+    # Stations first, so every link in the chunk has both ends.
+    new = {}
+    for row in chunk:
+        for position in (row[:2], row[2:]):
+            if position and G.vertex_at(*position) is None:
+                new.setdefault(position, None)
+
+    if new:
+        xs = [x for x, _ in new]
+        ys = [y for _, y in new]
+        G.insert_vertices(xs, ys)
+        stats.stations += len(new)
+
+    pairs = []
+    for row in chunk:
+        if len(row) == 4:
+            u, v = G.vertex_at(*row[:2]), G.vertex_at(*row[2:])
+            if u is v:
+                stats.malformed += 1
+                continue
+            pairs.append((u, v))
+
+    added = G.bulk_insert_edges(pairs)
+    stats.links += added
+    stats.duplicate_links += len(pairs) - added
@@ -0,0 +1,218 @@
+"""
+Opt-in counters and timings for a Graph.
+
+    stats = G.instrument()
+    ... queries ...
+    print(stats.snapshot())
+    G.uninstrument()
+
+While a graph is instrumented, its public methods are replaced on the
+instance by timed wrappers and Graph.distance by a counting one, so an
+uninstrumented graph runs exactly the code it always did. The searches
+report their work once per call from the maps they already keep, never
+from inside their loops.
+"""
+
+import collections
+import contextlib
+import cProfile
+import json
+import pstats
+import time
+import tracemalloc
+
+OPERATIONS = ('insert_vertex', 'insert_vertices', 'insert_edge', 'bulk_insert_edges', 'remove_vertex', 'remove_vertices',
+              'move_vertex', 'move_vertices', 'find_emergency_range', 'find_emergency_ranges',
+              'find_path', 'minimum_range', 'minimum_range_all', 'range_index', 'can_reach',
+              'reachable_stations', 'coverage_curve', 'stations_within', 'nearest_station')
+
+
+class Instrumentation:
+    """
+    Per operation: calls, total and largest wall time, and a histogram of
+    wall times in powers of two microseconds. Work counters (vertices
+    settled, adjacency entries relaxed, breadth first layer sizes, range
+    index builds and cache hits) are kept per search, and distance
+    evaluations per operation, including the operations it calls.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.calls = collections.Counter()
+        self.seconds = collections.Counter()
+        self.slowest = collections.Counter()
+        self.histograms = collections.defaultdict(collections.Counter)
+        self.work = collections.defaultdict(collections.Counter)
+        self.distance_evaluations = 0
+
+    def attach(self, G):
+        # Shadow G's methods with instance attributes that record into
+        # whatever G.instrumentation is at call time.
+        for name in OPERATIONS:
+            setattr(G, name, _timed(G, name, getattr(type(G), name).__get__(G)))
+
+        distance = type(G).distance
+
+        def counted_distance(u, v):
+            G.instrumentation.distance_evaluations += 1
+            return distance(u, v)
+
+        G.distance = counted_distance
+
+    @staticmethod
+    def detach(G):
+        for name in OPERATIONS + ('distance',):
+            G.__dict__.pop(name, None)
+
+    def timed(self, name, seconds, distances):
+        self.calls[name] += 1
+        self.seconds[name] += seconds
+        self.slowest[name] = max(self.slowest[name], seconds)
+        # Bucket k holds calls of less than 2^k microseconds.
+        self.histograms[name][int(seconds * 1e6).bit_length()] += 1
+        if distances:
+            self.work[name]['distance'] += distances
+
+    def search(self, operation, parents, unsettled=(), distances=0):
+        # A breadth first search that stopped with the given parent maps,
+        # whose keys are in the order the search reached them. Vertices
+        # in unsettled were reached but their neighbours weren't scanned,
+        # and distances is how many distances to the base it computed.
+        self.distance_evaluations += distances
+        work = self.work[operation]
+        unsettled = set(unsettled)
+        peak = 0
+
+        for parent in parents:
+            depth = {}
+            layers = collections.Counter()
+            for v, p in parent.items():
+                d = 0 if p is None else depth[p] + 1
+                depth[v] = d
+                layers[d] += 1
+                if v not in unsettled:
+                    work['settled'] += 1
+                    work['relaxed'] += len(v._adjacent)
+            work['reached'] += len(parent)
+            peak = max(peak, max(layers.values()))
+
+        work['searches'] += 1
+        work['frontier_total'] += peak
+        work['frontier_peak'] = max(work['frontier_peak'], peak)
+
+    def index_built(self, vertices, distances):
+        # RangeIndex scans every vertex.
+        self.distance_evaluations += distances
+        work = self.work['range_index']
+        work['builds'] += 1
+        work['settled'] += len(vertices)
+        work['relaxed'] += sum(len(v._adjacent) for v in vertices)
+
+    def cache(self, operation, hit):
+        self.work[operation]['cache_hits' if hit else 'cache_misses'] += 1
+
+    def merge(self, other):
+        self.calls.update(other.calls)
+        self.seconds.update(other.seconds)
+        for name, seconds in other.slowest.items():
+            self.slowest[name] = max(self.slowest[name], seconds)
+        for name, histogram in other.histograms.items():
+            self.histograms[name].update(histogram)
+        for name, work in other.work.items():
+            peak = max(self.work[name]['frontier_peak'], work['frontier_peak'])
+            self.work[name].update(work)
+            self.work[name]['frontier_peak'] = peak
+        self.distance_evaluations += other.distance_evaluations
+
+    def snapshot(self):
+        # Plain dicts and numbers, ready for json.
+        operations = {}
+        for name in sorted(set(self.calls) | set(self.work)):
+            calls = self.calls[name]
+            entry = {
+                'calls': calls,
+                'seconds': self.seconds[name],
+                'mean_ms': 1000 * self.seconds[name] / calls if calls else 0.0,
+                'max_ms': 1000 * self.slowest[name],
+                'histogram_us': {str(1 << k): n for k, n in sorted(self.histograms[name].items())},
+            }
+            entry.update(self.work[name])
+            operations[name] = entry
+        return {'distance_evaluations': self.distance_evaluations, 'operations': operations}
+
+    def export(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=1)
+
+
+class Profile:
+    """
+    What Graph.profile() captured: the instrumentation of the block,
+    and the cProfile stats or the tracemalloc peak and snapshot.
+    """
+
+    def __init__(self, kind):
+        if kind not in ('cprofile', 'tracemalloc'):
+            raise ValueError("Unknown profile kind {}!".format(kind))
+        self.kind = kind
+        self.instrumentation = Instrumentation()
+        self.stats = None
+        self.peak = None
+        self.memory = None
+
+    def print_stats(self, limit=20, sort='cumulative'):
+        self.stats.sort_stats(sort).print_stats(limit)
+
+
+def _timed(G, name, method):
+    def wrapper(*args, **kwargs):
+        stats = G.instrumentation
+        distances = stats.distance_evaluations
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            stats = G.instrumentation
+            stats.timed(name, time.perf_counter() - start, stats.distance_evaluations - distances)
+    wrapper.__name__ = name
+    return wrapper
+
+
+@contextlib.contextmanager
+def profile(G, kind='cprofile'):
+    # Instruments G for the block (if it wasn't already) and records the
+    # block's operations on their own before adding them to G's totals.
+    result = Profile(kind)
+    attached = G.instrumentation is None
+    if attached:
+        G.instrument()
+    outer = G.instrumentation
+    G.instrumentation = result.instrumentation
+
+    profiler = cProfile.Profile() if kind == 'cprofile' else None
+    tracing = kind == 'tracemalloc' and not tracemalloc.is_tracing()
+    if profiler is not None:
+        profiler.enable()
+    elif tracing:
+        tracemalloc.start()
+    else:
+        tracemalloc.reset_peak()
+
+    try:
+        yield result
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            result.stats = pstats.Stats(profiler)
+        else:
+            result.peak = tracemalloc.get_traced_memory()[1]
+            result.memory = tracemalloc.take_snapshot()
+            if tracing:
+                tracemalloc.stop()
+
+        G.instrumentation = outer
+        outer.merge(result.instrumentation)
+        if attached:
+            G.uninstrument()
@@ -0,0 +1,157 @@
+import bisect
+import collections
+import collections.abc
+import math
+
+from unionfind import UnionFind
+
+inf = float('inf')
+
+Coverage = collections.namedtuple('Coverage', ['range', 'count', 'stations'])
+
+
+class Stations(collections.abc.Sequence):
+    """
+    The first count stations an index reached, read straight from the
+    index's list instead of copied out of it. An index is never changed
+    after it is built, so the view keeps its contents.
+    """
+
+    __slots__ = ('_reached', '_count')
+
+    def __init__(self, reached, count):
+        self._reached = reached
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._reached[j] for j in range(self._count)[i]]
+        return self._reached[range(self._count)[i]]
+
+    def __eq__(self, other):
+        if isinstance(other, (Stations, list, tuple)):
+            return len(self) == len(other) and all(u is v for u, v in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return "Stations({})".format(list(self))
+
+
+class RangeIndex:
+    """
+    For one base station b, the smallest radio range that makes each station
+    reachable, i.e. the smallest r for which find_path(b, s, r) succeeds.
+
+    Built by adding stations in order of distance from b and joining them
+    to already added neighbours with a union-find. When a station's
+    component joins the component of b, every station in it becomes
+    reachable at the range of the station just added.
+
+    This is the same sweep as a Kruskal reconstruction tree over the
+    weights dist(v, b). With a single base the lowest common ancestor of b
+    and s in that tree is always where s's component joins b's, so the
+    tree is kept as that one threshold per station.
+    """
+
+    def __init__(self, b, vertices, squared=None):
+        # squared: squared distances from b to reuse, by vertex. Missing
+        # ones are computed and added.
+        self.base = b
+        squared = {} if squared is None else squared
+
+        def square(v):
+            d2 = squared.get(v)
+            if d2 is None:
+                d2 = squared[v] = (v.x_pos - b.x_pos)**2 + (v.y_pos - b.y_pos)**2
+            return d2
+
+        # b goes first even if another station shares its position.
+        order = [b] + sorted((v for v in vertices if v is not b), key=square)
+        position = {v: i for i, v in enumerate(order)}
+
+        sets = UnionFind(len(order))
+        # Stations of each component that can't reach b yet, by root. The
+        # component holding b maps to None.
+        members = {}
+        self._thresholds = {b: 0}
+        reached = [b]
+
+        for i, v in enumerate(order):
+            members[i] = None if i == 0 else [v]
+
+            for u in v._adjacent:
+                j = position.get(u)
+                # Only stations closer to b than v have been added so far.
+                if j is None or j >= i:
+                    continue
+
+                merged = sets.union(i, j)
+                if merged is None:
+                    continue
+                root, absorbed = merged
+
+                kept = members[root]
+                joined = members.pop(absorbed)
+                if kept is not None and joined is not None:
+                    kept.extend(joined)
+                    continue
+
+                # One side holds b, the other just became reachable at v's range.
+                joined = kept if joined is None else joined
+                r = math.sqrt(squared[v])
+                for w in joined:
+                    self._thresholds[w] = r
+                reached.extend(joined)
+                members[root] = None
+
+        self._reached = reached
+        self._ranges = [self._thresholds[v] for v in reached]
+        # find_path(b, b, r) is [b] for any r, even a negative one.
+        self._ranges[0] = -inf
+
+    def weight(self, v):
+        b = self.base
+        return math.sqrt((v.x_pos - b.x_pos)**2 + (v.y_pos - b.y_pos)**2)
+
+    def threshold(self, s):
+        # Smallest range that reaches s, inf if no range does.
+        return self._thresholds.get(s, inf)
+
+    def is_reachable(self, s, r):
+        return s is self.base or self._thresholds.get(s, inf) <= r
+
+    def reachable(self, r):
+        # Every station reachable with range r, nearest thresholds first.
+        # That is always at least b.
+        return self._reached[:bisect.bisect_right(self._ranges, r)]
+
+    def coverage_curve(self, ranges):
+        # A Coverage of the stations reachable at each range, in the order
+        # given. The stations of each are nearest thresholds first, as a
+        # view of the index, so each range costs one binary search.
+        curve = []
+        for r in ranges:
+            count = bisect.bisect_right(self._ranges, r)
+            curve.append(Coverage(r, count, Stations(self._reached, count)))
+        return curve
+
+    def survives(self, changed=(), edges=()):
+        # Whether the thresholds still hold after the vertices in changed
+        # were added, moved or removed (or lost edges) and the edges in
+        # edges were added. Unreachable vertices can be changed freely:
+        # they can't be reached through any path, so no path through them
+        # counts. A new edge matters only if it lowers the threshold of one
+        # of its ends, since any path through it could otherwise go
+        # straight to that end instead.
+        thresholds = self._thresholds
+        if any(v in thresholds for v in changed):
+            return False
+
+        for u, v in edges:
+            tu, tv = thresholds.get(u, inf), thresholds.get(v, inf)
+            if tv > max(tu, self.weight(v)) or tu > max(tv, self.weight(u)):
+                return False
+        return True
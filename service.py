@@ -0,0 +1,138 @@
+"""
+asyncio front end for a Graph, for serving queries to many clients.
+
+Queries run on a thread pool so the event loop stays responsive. Graph
+guards the caches its queries fill in, so different queries can run on
+the live graph at the same time.
+Identical queries that arrive while one is already running wait for that
+one instead of starting their own. Mutations take a write lock, so they
+never overlap a running query or each other.
+"""
+
+import asyncio
+import contextlib
+import functools
+
+READS = ('find_emergency_range', 'find_path', 'minimum_range', 'minimum_range_all')
+WRITES = ('insert_vertex', 'insert_vertices', 'insert_edge', 'remove_vertex', 'remove_vertices', 'move_vertex', 'move_vertices')
+
+
+class ReadWriteLock:
+    """
+    Any number of readers or a single writer. A waiting writer holds back
+    new readers, so a steady stream of queries can't starve mutations.
+    """
+
+    def __init__(self):
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+        self._changed = asyncio.Condition()
+
+    @contextlib.asynccontextmanager
+    async def reading(self):
+        async with self._changed:
+            await self._changed.wait_for(lambda: not self._writer and not self._waiting_writers)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._changed:
+                self._readers -= 1
+                self._changed.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def writing(self):
+        async with self._changed:
+            self._waiting_writers += 1
+            try:
+                await self._changed.wait_for(lambda: not self._writer and not self._readers)
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._changed:
+                self._writer = False
+                self._changed.notify_all()
+
+
+class GraphService:
+    def __init__(self, graph, executor=None):
+        """
+        :param graph: The Graph to serve. Don't change it other than
+                      through this service while it is in use.
+        :param executor: concurrent.futures executor for the queries,
+                         defaults to the event loop's default executor.
+        """
+
+        self.graph = graph
+        self._executor = executor
+        self._lock = ReadWriteLock()
+        self._inflight = {}
+
+        # How many requests were received and how many actually ran.
+        self.requests = 0
+        self.computations = 0
+
+    async def request(self, name, *args):
+        """
+        Runs the Graph method called name, e.g.
+        await service.request('minimum_range', b, s).
+        """
+
+        self.requests += 1
+        if name in READS:
+            return await self._read(name, args)
+        if name in WRITES:
+            return await self._write(name, args)
+        raise ValueError("Unknown request {}!".format(name))
+
+    async def find_emergency_range(self, v):
+        return await self.request('find_emergency_range', v)
+
+    async def find_path(self, b, s, r):
+        return await self.request('find_path', b, s, r)
+
+    async def minimum_range(self, b, s):
+        return await self.request('minimum_range', b, s)
+
+    async def move_vertex(self, v, new_x, new_y):
+        return await self.request('move_vertex', v, new_x, new_y)
+
+    async def insert_edge(self, u, v):
+        return await self.request('insert_edge', u, v)
+
+    async def remove_vertex(self, v):
+        return await self.request('remove_vertex', v)
+
+    async def _read(self, name, args):
+        key = (name,) + args
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_read(name, args))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._finished, key))
+
+        # A cancelled caller mustn't cancel the query for everyone else.
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _run_read(self, name, args):
+        async with self._lock.reading():
+            self.computations += 1
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(getattr(self.graph, name), *args))
+
+    async def _write(self, name, args):
+        async with self._lock.writing():
+            # Queries still finishing saw the old graph, later ones must not
+            # join them.
+            self._inflight.clear()
+            self.computations += 1
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(getattr(self.graph, name), *args))
@@ -0,0 +1,213 @@
+"""
+Immutable, versioned views of a Graph for readers running alongside a
+writer.
+
+The writer takes a snapshot after a batch of changes (Graph.snapshot())
+and hands it to readers, who can query it for as long as they like while
+the graph keeps changing. Only the writer should call Graph.snapshot(),
+since it reads the live graph.
+
+A snapshot stores each vertex's position and neighbours as tuples, in
+two ChunkedMaps that split the vertices by id into chunks of 256. The
+next snapshot copies only the chunks holding vertices that changed in
+between, plus one reference per chunk, and shares every other chunk
+with the previous version. Taking a snapshot therefore costs about the
+number of changed vertices, not the size of the graph.
+"""
+
+import collections
+import collections.abc
+import heapq
+import itertools
+import math
+
+from hull import convex_hull, farthest_squared
+
+inf = float('inf')
+
+Position = collections.namedtuple('Position', ['x_pos', 'y_pos'])
+
+# Vertices with the same id >> CHUNK_BITS share a chunk.
+CHUNK_BITS = 8
+
+
+class ChunkedMap(collections.abc.Mapping):
+    """
+    Read-only map keyed by vertex, kept as a dict of chunks by id. A new
+    version made with updated() shares every chunk it didn't change.
+    """
+
+    __slots__ = ('chunks', '_length')
+
+    def __init__(self, chunks, length):
+        self.chunks = chunks
+        self._length = length
+
+    @classmethod
+    def build(cls, items):
+        chunks = {}
+        length = 0
+        for v, value in items:
+            chunks.setdefault(v.id >> CHUNK_BITS, {})[v] = value
+            length += 1
+        return cls(chunks, length)
+
+    def updated(self, changes, removed=()):
+        # A new map with the (v, value) pairs of changes set and the
+        # vertices of removed dropped. Only the chunks they fall in are
+        # copied.
+        chunks = self.chunks.copy()
+        length = self._length
+        copied = set()
+
+        def writable(k):
+            if k not in copied:
+                chunk = chunks.get(k)
+                chunks[k] = {} if chunk is None else chunk.copy()
+                copied.add(k)
+            return chunks[k]
+
+        for v, value in changes:
+            chunk = writable(v.id >> CHUNK_BITS)
+            if v not in chunk:
+                length += 1
+            chunk[v] = value
+
+        for v in removed:
+            k = v.id >> CHUNK_BITS
+            if v not in chunks.get(k, ()):
+                continue
+            chunk = writable(k)
+            del chunk[v]
+            length -= 1
+            if not chunk:
+                del chunks[k]
+                copied.discard(k)
+
+        return ChunkedMap(chunks, length)
+
+    def __getitem__(self, v):
+        chunk = self.chunks.get(v.id >> CHUNK_BITS)
+        if chunk is None:
+            raise KeyError(v)
+        return chunk[v]
+
+    def __contains__(self, v):
+        chunk = self.chunks.get(getattr(v, 'id', -1) >> CHUNK_BITS)
+        return chunk is not None and v in chunk
+
+    def __iter__(self):
+        for chunk in self.chunks.values():
+            yield from chunk
+
+    def __len__(self):
+        return self._length
+
+
+class GraphSnapshot:
+    def __init__(self, version, positions, adjacency):
+        self.version = version
+        self._positions = positions
+        self._adjacency = adjacency
+        self._hull = None
+
+    @classmethod
+    def capture(cls, G, previous=None, changed=None):
+        """
+        Snapshot of G as it is now.
+        :param previous: An earlier snapshot of G to share entries with.
+        :param changed: The vertices changed since previous was taken.
+        """
+
+        if previous is None or changed is None:
+            positions = ChunkedMap.build((v, Position(v.x_pos, v.y_pos)) for v in G._vertices)
+            adjacency = ChunkedMap.build((v, tuple(v._adjacent)) for v in G._vertices)
+        else:
+            present = [v for v in changed if v in G._slots]
+            removed = [v for v in changed if v not in G._slots]
+            positions = previous._positions.updated(
+                ((v, Position(v.x_pos, v.y_pos)) for v in present), removed)
+            adjacency = previous._adjacency.updated(
+                ((v, tuple(v._adjacent)) for v in present), removed)
+
+        return cls(G._version, positions, adjacency)
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, v):
+        return v in self._positions
+
+    @property
+    def vertices(self):
+        return list(self._positions)
+
+    def position(self, v):
+        return self._positions[v]
+
+    def neighbours(self, v):
+        return self._adjacency[v]
+
+    def distance(self, u, v):
+        chunks = self._positions.chunks
+        p, q = chunks[u.id >> CHUNK_BITS][u], chunks[v.id >> CHUNK_BITS][v]
+        return math.sqrt((q.x_pos - p.x_pos)**2 + (q.y_pos - p.y_pos)**2)
+
+    def find_emergency_range(self, v):
+        # Like Graph, only the convex hull needs scanning.
+        if self._hull is None:
+            self._hull = convex_hull(self._positions.values())
+        p = self._positions[v]
+        return math.sqrt(farthest_squared(self._hull, p.x_pos, p.y_pos))
+
+    def find_path(self, b, s, r):
+        # Same search as Graph.find_path, on this version.
+        if b == s:
+            return [b]
+
+        adjacency = self._adjacency
+        parent = {b: None}
+        storage = collections.deque([b])
+
+        while storage:
+            cursor = storage.popleft()
+            for opposite in adjacency[cursor]:
+                if opposite in parent or self.distance(opposite, b) > r:
+                    continue
+                parent[opposite] = cursor
+
+                if opposite == s:
+                    path = []
+                    while opposite is not None:
+                        path.append(opposite)
+                        opposite = parent[opposite]
+                    path.reverse()
+                    return path
+                storage.append(opposite)
+
+    def minimum_range(self, b, s):
+        return self.minimum_range_all(b).get(s, inf)
+
+    def minimum_range_all(self, b):
+        # Same minimax sweep as Graph.minimum_range_all, on this version.
+        adjacency = self._adjacency
+        D = {b: 0}
+        visited = set()
+        tie = itertools.count()
+        heap = [(0, next(tie), b)]
+
+        while heap:
+            d, _, cursor = heapq.heappop(heap)
+            if cursor in visited:
+                continue
+            visited.add(cursor)
+
+            for opposite in adjacency[cursor]:
+                if opposite in visited:
+                    continue
+                candidate = max(self.distance(opposite, b), d)
+                if candidate < D.get(opposite, inf):
+                    D[opposite] = candidate
+                    heapq.heappush(heap, (candidate, next(tie), opposite))
+
+        return {v: D.get(v, inf) for v in self._positions}
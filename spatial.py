@@ -0,0 +1,101 @@
+import math
+
+
+class GridIndex:
+    """
+    Uniform grid over vertex positions. Each square cell of side ``cell``
+    holds the vertices inside it, so range and nearest neighbour queries
+    only look at nearby cells.
+
+    Vertices are filed under their position when added, so remove a vertex
+    before moving it and add it back afterwards.
+    """
+
+    def __init__(self, cell, vertices=()):
+        self.cell = cell
+        self._cells = {}
+        self._size = 0
+        # Bounds of every cell ever used, to stop nearest() on sparse grids.
+        self._bounds = None
+        for v in vertices:
+            self.add(v)
+
+    def __len__(self):
+        return self._size
+
+    def _key(self, x_pos, y_pos):
+        return (math.floor(x_pos / self.cell), math.floor(y_pos / self.cell))
+
+    def add(self, v):
+        key = self._key(v.x_pos, v.y_pos)
+        self._cells.setdefault(key, []).append(v)
+        self._size += 1
+
+        if self._bounds is None:
+            self._bounds = [key[0], key[1], key[0], key[1]]
+        else:
+            b = self._bounds
+            b[0], b[1] = min(b[0], key[0]), min(b[1], key[1])
+            b[2], b[3] = max(b[2], key[0]), max(b[3], key[1])
+
+    def remove(self, v):
+        key = self._key(v.x_pos, v.y_pos)
+        members = self._cells[key]
+        members.remove(v)
+        if not members:
+            del self._cells[key]
+        self._size -= 1
+
+    def within(self, x_pos, y_pos, r):
+        # Vertices in the cells overlapping the square around the point,
+        # a superset of those within r that callers filter by distance.
+        x0, y0 = self._key(x_pos - r, y_pos - r)
+        x1, y1 = self._key(x_pos + r, y_pos + r)
+
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._cells):
+            for (cx, cy), members in self._cells.items():
+                if x0 <= cx <= x1 and y0 <= cy <= y1:
+                    yield from members
+            return
+
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                members = self._cells.get((cx, cy))
+                if members:
+                    yield from members
+
+    def nearest(self, x_pos, y_pos):
+        # Searches rings of cells outward from the point's cell. Once the
+        # best distance found beats anything the next ring could hold, stop.
+        if not self._size:
+            return None
+
+        cx, cy = self._key(x_pos, y_pos)
+        b = self._bounds
+        last_ring = max(cx - b[0], b[2] - cx, cy - b[1], b[3] - cy, 0)
+
+        best = None
+        best_d = math.inf
+        for k in range(last_ring + 1):
+            for key in self._ring(cx, cy, k):
+                for v in self._cells.get(key, ()):
+                    d = (v.x_pos - x_pos)**2 + (v.y_pos - y_pos)**2
+                    if d < best_d:
+                        best, best_d = v, d
+
+            if best is not None and best_d <= (k * self.cell)**2:
+                break
+        return best
+
+    @staticmethod
+    def _ring(cx, cy, k):
+        # Cells at Chebyshev distance exactly k from (cx, cy).
+        if k == 0:
+            yield (cx, cy)
+            return
+        for dx in range(-k, k + 1):
+            yield (cx + dx, cy - k)
+            yield (cx + dx, cy + k)
+        for dy in range(-k + 1, k):
+            yield (cx - k, cy + dy)
+            yield (cx + k, cy + dy)
@@ -0,0 +1,50 @@
+"""
+Graphs and reference implementations shared by the test files (and the
+benchmarks that compare against the same references).
+"""
+
+from graph import Graph, inf
+
+
+def random_graph(rng, n, edges=0, low=0, high=100, max_length=None):
+    """
+    Scatters n stations over the square [low, high]^2 and then tries edges
+    random pairs, skipping pairs that are already linked or, when
+    max_length is given, not closer than max_length. Not necessarily
+    connected.
+    :param rng: The random.Random to draw from, left where the graph ends.
+    :return: The graph and its vertices.
+    """
+
+    G = Graph()
+    vertices = [G.insert_vertex(rng.uniform(low, high), rng.uniform(low, high)) for _ in range(n)]
+    for _ in range(edges):
+        u, v = rng.sample(vertices, 2)
+        if u.has_neighbour(v) or (max_length is not None and not G.distance(u, v) < max_length):
+            continue
+        G.insert_edge(u, v)
+    return G, vertices
+
+
+def legacy_minimum_range(G, b, s):
+    # The O(V^2) selection loop the original minimum_range used.
+    D = {vertex: inf for vertex in G._vertices}
+    D[b] = 0
+    vertices = G._vertices.copy()
+    visited = []
+
+    while vertices:
+        cursor = min(vertices, key=lambda vertex: D[vertex])
+        visited.append(cursor)
+
+        if D[cursor] == inf:
+            break
+
+        for edge in cursor.edges:
+            opposite = G.opposite(edge, cursor)
+
+            if max(G.distance(opposite, b), D[cursor]) <= D[opposite] and opposite not in visited:
+                D[opposite] = max(G.distance(opposite, b), D[cursor])
+
+        vertices.remove(cursor)
+    return D[s]
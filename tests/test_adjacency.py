@@ -0,0 +1,267 @@
+"""
+Test File 5
+-----------
+
+Tests the adjacency bookkeeping behind insert_edge and remove_vertex.
+
+python3 -m unittest tests/test_adjacency.py
+"""
+
+import random
+import unittest
+
+from edge import Edge
+from graph import Graph, EdgeAlreadyExists, VertexNotInGraph
+from vertex import Vertex
+
+
+def describe(G):
+    """
+    Positions of the vertices and the neighbour rows of each, in order.
+    """
+
+    row = {v: i for i, v in enumerate(G._vertices)}
+    return [((v.x_pos, v.y_pos), [row[u] for u in v._adjacent]) for v in G._vertices]
+
+
+class AdjacencyTest(unittest.TestCase):
+
+    def test_hub_with_many_spokes(self):
+        """
+        Can we load and remove a station with thousands of edges?
+        """
+
+        G = Graph()
+        hub = G.insert_vertex(0, 0)
+        spokes = [G.insert_vertex(i, 1) for i in range(5000)]
+
+        for v in spokes:
+            G.insert_edge(hub, v)
+
+        assert len(hub.edges) == 5000, "Expected 5000 edges, got {}".format(len(hub.edges))
+
+        G.remove_vertex(hub)
+
+        assert all(len(v.edges) == 0 for v in spokes), "Spokes kept edges to the removed hub"
+        assert hub not in G._vertices and len(G._vertices) == 5000
+
+    def test_duplicate_edge_either_direction(self):
+        """
+        Is an edge rejected when it already exists in either direction?
+        """
+
+        G = Graph()
+        u = G.insert_vertex(0, 0)
+        v = G.insert_vertex(1, 1)
+
+        G.insert_edge(u, v)
+
+        with self.assertRaises(EdgeAlreadyExists):
+            G.insert_edge(u, v)
+        with self.assertRaises(EdgeAlreadyExists):
+            G.insert_edge(v, u)
+
+    def test_edges_survive_moves(self):
+        """
+        Can an edge still be found and removed after its ends moved?
+        """
+
+        G = Graph()
+        u = G.insert_vertex(0, 0)
+        v = G.insert_vertex(1, 1)
+        w = G.insert_vertex(2, 2)
+
+        G.insert_edge(u, v)
+        G.insert_edge(v, w)
+        G.move_vertex(v, 5, 5)
+        G.move_vertex(u, 6, 6)
+
+        with self.assertRaises(EdgeAlreadyExists):
+            G.insert_edge(v, u)
+
+        G.remove_vertex(v)
+
+        assert u.edges == [] and w.edges == []
+        assert G._vertices == [u, w] or G._vertices == [w, u]
+
+    def test_removing_unknown_vertex(self):
+        """
+        Is removing a vertex twice an error?
+        """
+
+        G = Graph()
+        v = G.insert_vertex(0, 0)
+        G.remove_vertex(v)
+
+        with self.assertRaises(ValueError):
+            G.remove_vertex(v)
+
+
+class IdentityTest(unittest.TestCase):
+
+    def test_moved_vertex_stays_a_valid_key(self):
+        """
+        Can a vertex still be found in a dict after it moved?
+        """
+
+        G = Graph()
+        v = G.insert_vertex(1, 1)
+        ranges = {v: 0}
+
+        G.move_vertex(v, 8, 9)
+
+        assert v in ranges, "Moved vertex lost from dict"
+
+    def test_vertices_at_same_position_are_distinct(self):
+        """
+        Are two stations at the same position still different vertices?
+        """
+
+        u = Vertex(1, 1)
+        v = Vertex(1, 1)
+
+        assert u != v and len({u, v}) == 2
+
+    def test_edge_is_undirected(self):
+        """
+        Do Edge(u, v) and Edge(v, u) compare and hash the same?
+        """
+
+        u = Vertex(1, 1)
+        v = Vertex(2, 2)
+
+        assert Edge(u, v) == Edge(v, u)
+        assert hash(Edge(u, v)) == hash(Edge(v, u))
+        assert Edge(u, v) != Edge(u, Vertex(2, 2))
+
+
+class BulkLoadTest(unittest.TestCase):
+
+    def test_from_arrays_matches_incremental_build(self):
+        """
+        Does from_arrays build exactly what insert_vertex/insert_edge build?
+        """
+
+        rng = random.Random(2)
+        xs = [rng.uniform(0, 10) for _ in range(200)]
+        ys = [rng.uniform(0, 10) for _ in range(200)]
+        pairs = [tuple(rng.sample(range(200), 2)) for _ in range(600)]
+        pairs += pairs[:50] + [(j, i) for i, j in pairs[50:100]]
+
+        G = Graph()
+        vertices = [G.insert_vertex(x, y) for x, y in zip(xs, ys)]
+        for i, j in pairs:
+            if not vertices[i].has_neighbour(vertices[j]):
+                G.insert_edge(vertices[i], vertices[j])
+
+        H = Graph.from_arrays(xs, ys, pairs)
+
+        assert describe(H) == describe(G), "Bulk loaded graph differs"
+        assert H.find_emergency_range(H._vertices[0]) == G.find_emergency_range(vertices[0])
+        assert H.minimum_range(H._vertices[0], H._vertices[1]) == G.minimum_range(vertices[0], vertices[1])
+
+    def test_insert_vertices_matches_insert_vertex(self):
+        """
+        Does insert_vertices add the same stations as insert_vertex?
+        """
+
+        G, H = Graph(), Graph()
+        for x, y in [(0, 0), (4, 0), (0, 3)]:
+            G.insert_vertex(x, y)
+        G.find_emergency_range(G._vertices[0])
+        H.insert_vertex(0, 0)
+        H.find_emergency_range(H._vertices[0])
+
+        added = H.insert_vertices([4, 0], [0, 3])
+
+        assert added == H._vertices[1:], "Expected the new vertices in order"
+        assert describe(H) == describe(G), "Bulk inserted vertices differ"
+        assert H.vertex_at(4, 0) is added[0]
+        assert H.find_emergency_range(H._vertices[0]) == G.find_emergency_range(G._vertices[0]) == 4
+        with self.assertRaises(ValueError):
+            H.insert_vertices([1, 2], [1])
+
+    def test_bulk_insert_edges_skips_duplicates(self):
+        """
+        Are repeated pairs and existing edges skipped?
+        """
+
+        G = Graph()
+        u, v, w = G.insert_vertex(0, 0), G.insert_vertex(1, 0), G.insert_vertex(0, 1)
+        G.insert_edge(u, v)
+
+        added = G.bulk_insert_edges([(v, u), (u, w), (w, u), (v, w)])
+
+        assert added == 2, "Expected 2 new edges, got {}".format(added)
+        assert len(u.edges) == 2 and len(v.edges) == 2 and len(w.edges) == 2
+
+    def test_bulk_insert_rejects_foreign_vertices(self):
+        """
+        Are vertices outside the graph rejected?
+        """
+
+        G = Graph()
+        u = G.insert_vertex(0, 0)
+
+        with self.assertRaises(VertexNotInGraph):
+            G.bulk_insert_edges([(u, Vertex(3, 3))])
+        with self.assertRaises(VertexNotInGraph):
+            Graph.from_arrays([0, 1], [0, 1], [(0, 2)])
+
+
+class RemoveVerticesTest(unittest.TestCase):
+
+    def build(self):
+        rng = random.Random(24)
+        xs = [rng.uniform(0, 10) for _ in range(150)]
+        ys = [rng.uniform(0, 10) for _ in range(150)]
+        pairs = [tuple(rng.sample(range(150), 2)) for _ in range(400)]
+        # a hub linked to a third of the graph
+        pairs += [(0, i) for i in range(1, 150, 3)]
+        return Graph.from_arrays(xs, ys, pairs)
+
+    def test_burst_matches_one_by_one(self):
+        """
+        Does removing a burst leave the same graph and answers as removing
+        the vertices one at a time?
+        """
+
+        G, H = self.build(), self.build()
+        rows = [0, 5, 6, 40, 41, 77, 149, 3]
+        for graph in (G, H):
+            graph.track_minimum_range(graph._vertices[1])
+            graph.minimum_range_all(graph._vertices[2])
+            graph.snapshot()
+
+        doomed = [G._vertices[i] for i in rows]
+        for v in doomed:
+            G.remove_vertex(v)
+        H.remove_vertices([H._vertices[i] for i in rows] + [H._vertices[5]])
+
+        assert describe(G) == describe(H), "Graphs differ after removal"
+        for i in range(len(G._vertices)):
+            for b in (1, 2, i):
+                assert G.minimum_range(G._vertices[b], G._vertices[i]) == H.minimum_range(H._vertices[b], H._vertices[i])
+        snapshot = H.snapshot()
+        assert set(snapshot.vertices) == set(H._vertices)
+        assert all(set(snapshot.neighbours(v)) == set(v._adjacent) for v in H._vertices), \
+            "The next snapshot should see the lost edges"
+
+        assert all(not v._adjacent for v in doomed), "Removed vertices keep no edges"
+
+    def test_burst_is_all_or_nothing(self):
+        """
+        Is nothing removed when one vertex of the burst isn't in the graph?
+        """
+
+        G = self.build()
+        before = describe(G)
+
+        with self.assertRaises(VertexNotInGraph):
+            G.remove_vertices([G._vertices[0], Vertex(1, 1)])
+
+        assert describe(G) == before, "Nothing should be removed"
+
+
+if __name__ == '__main__':
+    unittest.main()
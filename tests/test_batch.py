@@ -0,0 +1,81 @@
+"""
+Test File 9
+-----------
+
+Tests that batched queries give the same answers as one call each.
+
+python3 -m unittest tests/test_batch.py
+"""
+
+import random
+import unittest
+
+from graph import Graph
+from tests.helpers import random_graph
+
+
+class BatchQueryTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(8)
+        self.G, self.vertices = random_graph(rng, 80, 160)
+
+        self.queries = []
+        for _ in range(300):
+            kind = rng.choice(('minimum_range', 'find_path', 'find_emergency_range'))
+            b = rng.choice(self.vertices[:6])
+            s = rng.choice(self.vertices)
+            if kind == 'minimum_range':
+                self.queries.append((kind, b, s))
+            elif kind == 'find_path':
+                self.queries.append((kind, b, s, rng.choice((30, 60, 90))))
+            else:
+                self.queries.append((kind, s))
+
+    def expected(self):
+        answers = []
+        for query in self.queries:
+            answers.append(getattr(self.G, query[0])(*query[1:]))
+        return answers
+
+    def test_in_process(self):
+        """
+        Does the single process batch agree with individual calls?
+        """
+
+        assert list(self.G.run_queries(self.queries, processes=1)) == self.expected()
+
+    def test_process_pool(self):
+        """
+        Does the process pool return every answer in query order?
+        """
+
+        assert list(self.G.run_queries(self.queries, processes=2)) == self.expected()
+
+    def test_interleaved_batches(self):
+        """
+        Do two in-process batches on different graphs, consumed in turns,
+        each answer on their own graph?
+        """
+
+        # The same graph, ten times larger.
+        H = Graph()
+        twin = {v: H.insert_vertex(10 * v.x_pos, 10 * v.y_pos) for v in self.vertices}
+        H.bulk_insert_edges((twin[v], twin[u]) for v in self.vertices for u in v._adjacent)
+        others = [(q[0], twin[q[1]], twin[q[2]]) for q in self.queries if q[0] == 'minimum_range']
+        expected = [H.minimum_range(b, s) for _, b, s in others]
+
+        first = self.G.run_queries(self.queries, processes=1)
+        second = H.run_queries(others, processes=1)
+        answers, other_answers = [], []
+        for _ in range(len(others)):
+            answers.append(next(first))
+            other_answers.append(next(second))
+        answers += list(first)
+
+        assert answers == self.expected(), "The first batch answered on the other graph"
+        assert other_answers == expected, "The second batch answered on the other graph"
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Test File 6
+-----------
+
+Tests that the array backed CompactGraph answers queries like Graph.
+
+python3 -m unittest tests/test_compact.py
+"""
+
+import os
+import random
+import tempfile
+import unittest
+
+from graph import Graph
+from tests.helpers import random_graph
+
+
+def build_random_graph(n=120, seed=5):
+    """
+    Builds a random graph with a few removed vertices, so rows and
+    insertion order differ.
+    :return: The graph and its remaining vertices.
+    """
+
+    G, vertices = random_graph(random.Random(seed), n, 2 * n)
+    for v in vertices[:10]:
+        G.remove_vertex(v)
+    return G, vertices[10:]
+
+
+class CompactGraphTest(unittest.TestCase):
+
+    def test_queries_match_graph(self):
+        """
+        Do the compact queries return the same answers on rows?
+        """
+
+        G, vertices = build_random_graph()
+        C = G.compact()
+
+        assert len(C) == len(vertices)
+
+        for b in vertices[:8]:
+            i = C.row(b)
+            assert C.vertices[i] is b
+
+            assert C.find_emergency_range(i) == G.find_emergency_range(b)
+
+            ranges = C.minimum_range_all(i)
+            for s in vertices:
+                assert ranges[C.row(s)] == G.minimum_range(b, s), \
+                    "[minimum_range] disagrees for {} -> {}".format(b, s)
+
+                for r in (20, 45, 70):
+                    p = G.find_path(b, s, r)
+                    q = C.find_path(i, C.row(s), r)
+                    expected = None if p is None else [C.row(v) for v in p]
+                    assert q == expected, "[find_path] Expected: {} | Got: {}".format(expected, q)
+
+    def test_round_trip(self):
+        """
+        Does to_graph rebuild the same stations and links?
+        """
+
+        G, vertices = build_random_graph(40)
+        H = G.compact().to_graph()
+
+        def shape(graph):
+            return sorted(
+                tuple(sorted(((e.u.x_pos, e.u.y_pos), (e.v.x_pos, e.v.y_pos))))
+                for v in graph._vertices for e in v.edges)
+
+        assert [(v.x_pos, v.y_pos) for v in H._vertices] == [(v.x_pos, v.y_pos) for v in G._vertices]
+        assert shape(H) == shape(G)
+
+    def test_save_and_open(self):
+        """
+        Does a memory mapped graph answer like the graph that was saved?
+        """
+
+        G, vertices = build_random_graph()
+        C = G.compact()
+
+        # Cleanups run last in first out, so the map is closed before its
+        # file is deleted, even when an assertion fails.
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        path = os.path.join(folder.name, 'stations.graph')
+        G.save(path)
+        M = Graph.open(path)
+        self.addCleanup(M.close)
+
+        assert len(M) == len(C)
+        assert list(M.xs) == list(C.xs) and list(M.ys) == list(C.ys)
+        assert list(M.offsets) == list(C.offsets) and list(M.targets) == list(C.targets)
+
+        for b in range(5):
+            assert M.minimum_range_all(b) == C.minimum_range_all(b)
+            assert M.find_path(b, 50, 60) == C.find_path(b, 50, 60)
+            assert M.find_emergency_range(b) == C.find_emergency_range(b)
+
+        H = M.to_graph()
+        assert [(v.x_pos, v.y_pos) for v in H._vertices] == [(v.x_pos, v.y_pos) for v in G._vertices]
+
+    def test_open_rejects_other_files(self):
+        """
+        Is a file that isn't a saved graph rejected?
+        """
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'notes.txt')
+            with open(path, 'wb') as f:
+                f.write(b'not a graph at all, just some text')
+
+            with self.assertRaises(ValueError):
+                Graph.open(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
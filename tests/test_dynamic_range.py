@@ -0,0 +1,101 @@
+"""
+Test File 8
+-----------
+
+Checks that tracked minimum ranges match a full recomputation after
+every step of random update sequences.
+
+python3 -m unittest tests/test_dynamic_range.py
+"""
+
+import random
+import unittest
+
+from graph import Graph
+from range_index import RangeIndex
+
+
+def full_ranges(G, b):
+    """
+    Minimum ranges from b, recomputed from scratch.
+    """
+
+    index = RangeIndex(b, G._vertices)
+    return {v: index.threshold(v) for v in G._vertices}
+
+
+class RangeTrackerTest(unittest.TestCase):
+
+    def random_update(self, G, vertices, bases, rng):
+        """
+        Applies one random change to G.
+        """
+
+        step = rng.random()
+        if step < 0.35:
+            G.move_vertex(rng.choice(vertices), rng.uniform(0, 100), rng.uniform(0, 100))
+        elif step < 0.45:
+            G.move_vertices([(v, rng.uniform(0, 100), rng.uniform(0, 100))
+                             for v in rng.sample(vertices, 5)])
+        elif step < 0.7:
+            u, v = rng.sample(vertices, 2)
+            if not u.has_neighbour(v):
+                G.insert_edge(u, v)
+        elif step < 0.8:
+            G.bulk_insert_edges(tuple(rng.sample(vertices, 2)) for _ in range(4))
+        elif step < 0.9:
+            candidates = [v for v in vertices if v not in bases]
+            v = rng.choice(candidates)
+            G.remove_vertex(v)
+            vertices.remove(v)
+        else:
+            v = G.insert_vertex(rng.uniform(0, 100), rng.uniform(0, 100))
+            G.insert_edge(v, rng.choice(vertices))
+            vertices.append(v)
+
+    def test_random_update_sequences(self):
+        """
+        Do the tracked ranges equal a full recomputation after each update?
+        """
+
+        for seed in range(5):
+            rng = random.Random(seed)
+            G = Graph()
+            vertices = [G.insert_vertex(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(60)]
+            for _ in range(90):
+                u, v = rng.sample(vertices, 2)
+                if not u.has_neighbour(v):
+                    G.insert_edge(u, v)
+
+            bases = vertices[:3]
+            for b in bases:
+                G.track_minimum_range(b)
+
+            for step in range(150):
+                self.random_update(G, vertices, bases, rng)
+
+                for b in bases:
+                    expected = full_ranges(G, b)
+                    res = G.minimum_range_all(b)
+                    assert res == expected, \
+                        "seed {} step {}: tracked ranges from {} drifted".format(seed, step, b)
+
+    def test_tracking_stops_when_base_removed(self):
+        """
+        Is the tracker dropped with its base?
+        """
+
+        G = Graph()
+        b = G.insert_vertex(0, 0)
+        s = G.insert_vertex(3, 4)
+        G.insert_edge(b, s)
+
+        G.track_minimum_range(b)
+        assert G.minimum_range(b, s) == 5
+
+        G.remove_vertex(b)
+        assert b not in G._trackers
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Test File 3
+-----------
+
+Tests the emergency range queries stay correct as stations are inserted,
+moved and removed.
+
+python3 -m unittest tests/test_emergency_range.py
+"""
+
+import math
+import random
+import unittest
+
+from graph import Graph
+from tests.helpers import random_graph
+
+
+def brute_force_range(G, v):
+    return max([Graph.distance(u, v) for u in G._vertices] + [0])
+
+
+class EmergencyRangeTest(unittest.TestCase):
+
+    def build_random_graph(self, n=100, seed=3):
+        rng = random.Random(seed)
+        G, vertices = random_graph(rng, n, low=-50, high=50)
+        return G, vertices, rng
+
+    def test_emergency_range_follows_moves_and_removals(self):
+        """
+        Does find_emergency_range agree with a brute force scan after every
+        move and removal?
+        """
+
+        G, vertices, rng = self.build_random_graph()
+
+        for step in range(40):
+            v = rng.choice(vertices)
+            if step % 3 == 0:
+                G.remove_vertex(v)
+                vertices.remove(v)
+            else:
+                G.move_vertex(v, rng.uniform(-80, 80), rng.uniform(-80, 80))
+
+            for u in vertices:
+                expected = brute_force_range(G, u)
+                res = G.find_emergency_range(u)
+                assert math.isclose(res, expected), \
+                    "Expected: {} Got: {}".format(expected, res)
+
+    def test_batch_matches_single_queries(self):
+        """
+        Does find_emergency_ranges return the same values as one call each?
+        """
+
+        G, vertices, rng = self.build_random_graph()
+        G.remove_vertex(vertices.pop(5))
+
+        res = G.find_emergency_ranges(vertices)
+        expected = [G.find_emergency_range(v) for v in vertices]
+
+        assert res == expected, "Expected: {} Got: {}".format(expected, res)
+
+    def test_hull_grows_when_station_moves_outside(self):
+        """
+        Does an interior station that drifts outward become the furthest?
+        """
+
+        G = Graph()
+        corners = [G.insert_vertex(x, y) for x, y in ((0, 0), (10, 0), (10, 10), (0, 10))]
+        inner = G.insert_vertex(5, 5)
+
+        assert math.isclose(G.find_emergency_range(corners[0]), math.sqrt(200))
+
+        G.move_vertex(inner, 30, 30)
+        assert math.isclose(G.find_emergency_range(corners[0]), math.sqrt(1800))
+
+        G.remove_vertex(inner)
+        G.remove_vertex(corners[2])
+        assert math.isclose(G.find_emergency_range(corners[0]), 10)
+
+    def test_empty_graph_has_zero_range(self):
+        """
+        Is the range from a station outside an empty graph 0?
+        """
+
+        G = Graph()
+        v = G.insert_vertex(1, 1)
+        G.remove_vertex(v)
+
+        assert G.find_emergency_range(v) == 0
+        assert G.find_emergency_ranges([v]) == [0]
+
+
+if __name__ == '__main__':
+    unittest.main()
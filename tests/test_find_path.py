@@ -0,0 +1,327 @@
+"""
+Test File 4
+-----------
+
+Tests find_path on graphs where the number of distinct paths explodes.
+
+python3 -m unittest tests/test_find_path.py
+"""
+
+import math
+import random
+import unittest
+
+from graph import Graph
+from tests.helpers import random_graph
+
+
+def build_grid(size):
+    """
+    Builds a size x size grid of stations, linking every station to its
+    right, upper and upper-right neighbours.
+    :return: The graph and a dict from (x, y) to vertex.
+    """
+
+    G = Graph()
+    grid = {(x, y): G.insert_vertex(x, y) for x in range(size) for y in range(size)}
+    for (x, y), v in grid.items():
+        for dx, dy in ((1, 0), (0, 1), (1, 1)):
+            if (x + dx, y + dy) in grid:
+                G.insert_edge(v, grid[(x + dx, y + dy)])
+    return G, grid
+
+
+class FindPathTest(unittest.TestCase):
+
+    def test_finds_minimal_hops_across_dense_grid(self):
+        """
+        Can we cross a grid with exponentially many paths quickly?
+        """
+
+        G, grid = build_grid(30)
+        b, s = grid[(0, 0)], grid[(29, 20)]
+
+        p = G.find_path(b, s, 100)
+
+        assert p[0] == b and p[-1] == s, "Path {} has the wrong ends".format(p)
+        assert len(p) - 1 == 29, "Expected 29 hops, got {}".format(len(p) - 1)
+
+    def test_returns_none_when_range_too_small(self):
+        """
+        Is None returned when s is only reachable outside the range?
+        """
+
+        G, grid = build_grid(5)
+
+        assert G.find_path(grid[(0, 0)], grid[(4, 4)], 5) is None
+        assert G.find_path(grid[(0, 0)], grid[(4, 4)], 5.66) is not None
+
+    def test_path_to_itself(self):
+        """
+        Is the path from a station to itself just that station?
+        """
+
+        G, grid = build_grid(2)
+
+        assert G.find_path(grid[(1, 1)], grid[(1, 1)], 0) == [grid[(1, 1)]]
+
+    def test_out_of_range_target_is_rejected(self):
+        """
+        Is a target further than r from b rejected straight away?
+        """
+
+        G, grid = build_grid(3)
+
+        assert G.find_path(grid[(0, 0)], grid[(2, 2)], 2.8) is None
+        assert G.find_path(grid[(0, 0)], grid[(2, 2)], 2.8, bidirectional=True) is None
+
+
+class BidirectionalFindPathTest(unittest.TestCase):
+
+    def check_path(self, G, b, s, r, path):
+        assert path[0] == b and path[-1] == s, "Path {} has the wrong ends".format(path)
+        for u, v in zip(path, path[1:]):
+            assert u.has_neighbour(v), "{} and {} aren't linked".format(u, v)
+        for v in path:
+            assert G.distance(v, b) <= r, "{} is out of range".format(v)
+
+    def test_matches_hops_of_one_sided_search(self):
+        """
+        Does the search from both ends find paths just as short?
+        """
+
+        rng = random.Random(20)
+        G, vertices = random_graph(rng, 150, 400, max_length=25)
+
+        for _ in range(300):
+            b, s = rng.sample(vertices, 2)
+            r = rng.uniform(10, 120)
+            expected = G.find_path(b, s, r)
+            res = G.find_path(b, s, r, bidirectional=True)
+
+            if expected is None:
+                assert res is None, "Found {} where there is no path".format(res)
+            else:
+                self.check_path(G, b, s, r, res)
+                assert len(res) == len(expected), \
+                    "[find_path] Expected {} hops | Got: {}".format(len(expected) - 1, len(res) - 1)
+
+    def test_dense_grid(self):
+        """
+        Does the bidirectional search find the fewest hops across a large grid?
+        """
+
+        G, grid = build_grid(30)
+        b, s = grid[(0, 0)], grid[(29, 20)]
+
+        p = G.find_path(b, s, 100, bidirectional=True)
+
+        self.check_path(G, b, s, 100, p)
+        assert len(p) - 1 == 29, "Expected 29 hops, got {}".format(len(p) - 1)
+
+    def test_neighbours_and_itself(self):
+        """
+        Does the bidirectional search handle b itself and a direct neighbour?
+        """
+
+        G, grid = build_grid(2)
+        b = grid[(0, 0)]
+
+        assert G.find_path(b, b, 0, bidirectional=True) == [b]
+        assert G.find_path(b, grid[(1, 1)], 2, bidirectional=True) == [b, grid[(1, 1)]]
+
+
+class DistanceCacheTest(unittest.TestCase):
+
+    def test_range_boundary_matches_distance(self):
+        """
+        Is a station exactly r away still in range, and one a hair further not?
+        """
+
+        rng = random.Random(23)
+        G = Graph()
+        b = G.insert_vertex(0, 0)
+        for _ in range(200):
+            v = G.insert_vertex(rng.uniform(-50, 50), rng.uniform(-50, 50))
+            G.insert_edge(b, v)
+            r = G.distance(v, b)
+
+            assert G.find_path(b, v, r) == [b, v], "{} is exactly {} away".format(v, r)
+            assert G.find_path(b, v, math.nextafter(r, 0)) is None, "{} is out of range".format(v)
+            assert G.find_path(b, v, r, bidirectional=True) == [b, v]
+
+    def test_moves_drop_only_moved_vertices(self):
+        """
+        Does a move forget only the moved vertex's cached distances, and all of
+        them when the base itself moves?
+        """
+
+        G, grid = build_grid(4)
+        b = grid[(0, 0)]
+
+        assert len(G.find_path(b, grid[(3, 3)], 10)) == 4
+        squared = G._base_distances[b]
+        cached = len(squared)
+
+        G.move_vertex(grid[(1, 1)], 3.5, 0.5)
+        assert grid[(1, 1)] not in squared and len(squared) == cached - 1, \
+            "Only the moved vertex should be forgotten"
+        assert G.find_path(b, grid[(1, 1)], 3.5) is None, "(1, 1) is now too far from b"
+        assert G.find_path(b, grid[(1, 1)], 3.6) == [b, grid[(1, 1)]]
+        assert squared[grid[(1, 1)]] == 12.5
+
+        G.move_vertex(b, 9, 9)
+        assert b not in G._base_distances, "Moving the base drops its distances"
+
+    def test_bases_are_evicted(self):
+        """
+        Are the distances of the least recently used bases dropped first?
+        """
+
+        G, grid = build_grid(5)
+        G.distance_cache_size = 3
+        for x in range(5):
+            G.find_path(grid[(x, 0)], grid[(4, 4)], 100)
+
+        assert list(G._base_distances) == [grid[(2, 0)], grid[(3, 0)], grid[(4, 0)]]
+
+    def test_shared_with_range_index(self):
+        """
+        Does the range index reuse and complete the distances find_path cached?
+        """
+
+        G, grid = build_grid(5)
+        b = grid[(2, 2)]
+        G.find_path(b, grid[(2, 3)], 1)
+        partial = dict(G._base_distances[b])
+
+        index = G.range_index(b)
+        squared = G._base_distances[b]
+        assert len(squared) == 24 and all(squared[v] == d2 for v, d2 in partial.items())
+        assert index.threshold(grid[(0, 0)]) == G.distance(grid[(0, 0)], b)
+
+
+class RangeIndexTest(unittest.TestCase):
+
+    def build_random_graph(self, n=80, seed=11):
+        """
+        Builds a sparse random graph that is not necessarily connected.
+        :return: The graph and its vertices.
+        """
+
+        return random_graph(random.Random(seed), n, n)
+
+    def test_thresholds_match_minimum_range(self):
+        """
+        Is the threshold of every station its minimum range?
+        """
+
+        G, vertices = self.build_random_graph()
+
+        for b in vertices[:10]:
+            index = G.range_index(b)
+            for s in vertices:
+                expected = G.minimum_range(b, s)
+                res = index.threshold(s)
+                assert res == expected or math.isclose(res, expected), \
+                    "[range_index] Expected: {} | Got: {}".format(expected, res)
+
+    def test_decisions_match_find_path(self):
+        """
+        Does can_reach agree with find_path for a spread of ranges?
+        """
+
+        G, vertices = self.build_random_graph()
+        b = vertices[0]
+
+        for r in (0, 10, 25, 40, 60, 80, 150):
+            reachable = set(id(v) for v in G.reachable_stations(b, r))
+            for s in vertices:
+                found = G.find_path(b, s, r) is not None
+                assert G.can_reach(b, s, r) == found, \
+                    "can_reach({}, {}, {}) disagrees with find_path".format(b, s, r)
+                assert (id(s) in reachable) == found, \
+                    "reachable_stations({}, {}) disagrees on {}".format(b, r, s)
+
+    def test_coverage_curve_matches_find_path(self):
+        """
+        Does the coverage at each candidate range list exactly the stations
+        find_path reaches?
+        """
+
+        G, vertices = self.build_random_graph()
+        b = max(vertices, key=lambda v: len(v.edges))
+        ranges = [80, 0, 25, 10, 150, 40, 60, 25]
+
+        curve = G.coverage_curve(b, ranges)
+
+        assert [c.range for c in curve] == ranges, "Ranges should come back in the order given"
+        for r, count, stations in curve:
+            expected = set(id(s) for s in vertices if G.find_path(b, s, r) is not None)
+            assert count == len(stations) == len(expected), \
+                "[coverage_curve] r={} Expected: {} | Got: {}".format(r, len(expected), count)
+            assert set(id(s) for s in stations) == expected
+
+        assert curve[1].stations == [b], "Only b is reachable with range 0"
+        widest = list(curve[4].stations)
+        assert curve[4].stations[-1] is widest[-1] and curve[4].stations[1:3] == widest[1:3], \
+            "Indexing the stations should work like a list"
+
+    def test_nan_range_reaches_nothing(self):
+        """
+        Does a NaN range find no path, with or without a cached index,
+        like can_reach?
+        """
+
+        G, vertices = self.build_random_graph()
+        b = vertices[0]
+        s = next(iter(b._adjacent))
+
+        for bidirectional in (False, True):
+            assert G.find_path(b, s, math.nan, bidirectional) is None
+        G.range_index(b)
+        assert G.find_path(b, s, math.nan) is None and not G.can_reach(b, s, math.nan)
+
+    def test_base_reaches_itself_at_any_range(self):
+        """
+        Do can_reach, reachable_stations and coverage_curve agree with
+        find_path that b reaches itself, even with a negative range?
+        """
+
+        G, vertices = self.build_random_graph()
+        b = vertices[0]
+
+        for r in (-1, 0):
+            assert G.find_path(b, b, r) == [b]
+            assert G.can_reach(b, b, r), "can_reach disagrees with find_path at r={}".format(r)
+            assert G.reachable_stations(b, r) == [b]
+
+        curve = G.coverage_curve(b, [-5, -0.5])
+        assert [(c.count, list(c.stations)) for c in curve] == [(1, [b]), (1, [b])], \
+            "Expected only b at negative ranges, got {}".format(curve)
+        assert G.minimum_range(b, b) == 0
+
+    def test_index_is_rebuilt_after_changes(self):
+        """
+        Does a new edge make a station reachable again?
+        """
+
+        G = Graph()
+        A = G.insert_vertex(0, 0)
+        B = G.insert_vertex(3, 0)
+        C = G.insert_vertex(0, 4)
+
+        G.insert_edge(A, B)
+
+        assert not G.can_reach(A, C, 10)
+        assert G.find_path(A, C, 10) is None
+
+        G.insert_edge(B, C)
+
+        assert G.can_reach(A, C, 4)
+        assert not G.can_reach(A, C, 3.9)
+        assert G.find_path(A, C, 4) == [A, B, C]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Test File 12
+------------
+
+Tests streaming stations and links from CSV and JSONL files.
+
+python3 -m unittest tests/test_ingest.py
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from graph import Graph
+from ingest import ingest, ingest_file, read_csv, read_jsonl
+
+
+class IngestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, name, lines):
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
+
+    def test_csv(self):
+        """
+        Are CSV stations and links added once, skipping the bad rows?
+        """
+
+        path = self.write('survey.csv', [
+            'x1,y1,x2,y2',
+            '0,0,1,0',
+            '1,0,0,0',      # same link reversed
+            '1,0,2,0',
+            '5,5',          # station without links
+            '2,0,oops,1',   # malformed
+            '1,2,3',        # wrong width
+            '0,0,0,0',      # link to itself
+        ])
+
+        G = Graph()
+        stats = ingest_file(G, path, chunk_size=2)
+
+        assert len(G._vertices) == 4, "Stations should be created once per position"
+        assert stats.stations == 4, "Stats should count the new stations"
+        assert stats.links == 2, "The reversed link is a duplicate"
+        assert stats.duplicate_links == 1, "The reversed link is a duplicate"
+        assert stats.malformed == 3, "Bad rows should be skipped and counted"
+        assert stats.rows == 7, "The header isn't a row"
+
+        a, c = G.vertex_at(0.0, 0.0), G.vertex_at(2.0, 0.0)
+        assert G.find_path(a, c, 2) == [a, G.vertex_at(1.0, 0.0), c], "Links should be usable"
+        assert not G.vertex_at(5.0, 5.0).edges, "Station rows shouldn't add links"
+
+    def test_jsonl(self):
+        """
+        Are JSONL stations and links added once, skipping the bad lines?
+        """
+
+        path = self.write('survey.jsonl', [
+            json.dumps({'x': 3, 'y': 4}),
+            json.dumps({'from': [0, 0], 'to': [3, 4]}),
+            '{"from": [0, 0]',
+            json.dumps({'from': [0, 0], 'to': [3]}),
+            json.dumps({'x': 'north', 'y': 1}),
+            '',
+        ])
+
+        G = Graph()
+        stats = ingest(G, read_jsonl(path))
+
+        assert (stats.rows, stats.links, stats.malformed) == (5, 1, 3), "Wrong counts {}".format(stats)
+        assert G.minimum_range(G.vertex_at(0.0, 0.0), G.vertex_at(3.0, 4.0)) == 5, "Link should be usable"
+
+    def test_existing_stations(self):
+        """
+        Do rows naming existing positions reuse those vertices?
+        """
+
+        G = Graph()
+        a = G.insert_vertex(0, 0)
+        b = G.insert_vertex(1, 1)
+        G.insert_edge(a, b)
+
+        stats = ingest(G, [(0, 0, 1, 1), (1, 1, 2, 2)])
+
+        assert len(G._vertices) == 3, "Only (2, 2) is new"
+        assert stats.duplicate_links == 1, "a-b already existed"
+        assert b.has_neighbour(G.vertex_at(2, 2)), "b should link to (2, 2)"
+
+    def test_rows_are_streamed(self):
+        """
+        Are stations added before the whole input has been read?
+        """
+
+        G = Graph()
+        seen = []
+
+        def rows():
+            for i in range(10):
+                seen.append(len(G._vertices))
+                yield (i, 0, i + 1, 0)
+
+        reports = []
+        ingest(G, rows(), chunk_size=3, report=lambda stats: reports.append(stats.rows))
+
+        assert seen[4] > 0, "The first chunk should be in the graph while reading the second"
+        assert reports == [3, 6, 9, 10], "Should report after every chunk"
+
+    def test_header_only_on_first_line(self):
+        """
+        Is a non-numeric row only skipped as a header on the first line?
+        """
+
+        path = self.write('survey.csv', ['0,0', 'x,y'])
+        assert list(read_csv(path)) == [(0.0, 0.0), None], "Only the first line can be a header"
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Test File 13
+------------
+
+Tests the opt-in instrumentation and profiling hooks on Graph.
+
+python3 -m unittest tests/test_instrument.py
+"""
+
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from tests.helpers import random_graph
+
+
+def build_random_graph(seed=22, n=120):
+    return random_graph(random.Random(seed), n, 3 * n, max_length=30)
+
+
+class InstrumentationTest(unittest.TestCase):
+
+    def test_disabled_graph_is_untouched(self):
+        """
+        Does uninstrument leave no wrapped methods on the graph?
+        """
+
+        G, vertices = build_random_graph()
+
+        G.instrument()
+        G.uninstrument()
+
+        assert G.instrumentation is None
+        assert not [name for name in G.__dict__ if callable(G.__dict__[name])], \
+            "No method should stay shadowed on the instance"
+
+    def test_answers_are_unchanged(self):
+        """
+        Does an instrumented graph answer like an uninstrumented one?
+        """
+
+        G, vertices = build_random_graph()
+        H, others = build_random_graph()
+        H.instrument()
+
+        for i in range(30):
+            b, s = vertices[i], vertices[-i - 1]
+            c, t = others[i], others[-i - 1]
+            assert G.minimum_range(b, s) == H.minimum_range(c, t)
+            assert G.find_emergency_range(b) == H.find_emergency_range(c)
+            for bidirectional in (False, True):
+                p = G.find_path(b, s, 60, bidirectional)
+                q = H.find_path(c, t, 60, bidirectional)
+                assert (p is None) == (q is None)
+                assert p is None or len(p) == len(q)
+
+    def test_counters(self):
+        """
+        Do the counters match the calls made and the work they did?
+        """
+
+        G, vertices = build_random_graph()
+        stats = G.instrument()
+        b = max(vertices, key=lambda v: len(v.edges))
+
+        for s in vertices[1:11]:
+            G.minimum_range(b, s)
+            G.find_path(b, s, 150)
+        G.move_vertex(vertices[5], -1, -1)
+
+        snapshot = stats.snapshot()
+        json.dumps(snapshot)
+        operations = snapshot['operations']
+
+        assert operations['minimum_range']['calls'] == 10
+        assert operations['find_path']['calls'] == 10
+        assert operations['move_vertex']['calls'] == 1
+        assert sum(operations['find_path']['histogram_us'].values()) == 10, \
+            "Every call should land in one histogram bucket"
+
+        index = operations['range_index']
+        assert index['builds'] == 1 and index['cache_misses'] == 1 and index['cache_hits'] == 9, \
+            "The index should be built once, got {}".format(index)
+        assert index['settled'] == len(vertices)
+
+        search = operations['find_path']
+        assert search['settled'] <= search['reached'], "Can't settle more than was reached"
+        assert search['relaxed'] >= search['settled'] - search['searches'], "Too few edges relaxed"
+        assert 0 < search['frontier_peak'] <= search['reached']
+        assert search['distance'] > 0, "find_path measures distances"
+        assert snapshot['distance_evaluations'] >= search['distance']
+
+        stats.reset()
+        assert stats.snapshot()['operations'] == {}
+
+    def test_export(self):
+        """
+        Does export write the snapshot as JSON?
+        """
+
+        G, vertices = build_random_graph()
+        stats = G.instrument()
+        G.find_path(vertices[0], vertices[1], 100, bidirectional=True)
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'stats.json')
+            stats.export(path)
+            with open(path) as f:
+                assert json.load(f) == stats.snapshot()
+
+    def test_profile_block(self):
+        """
+        Does profile record only its block, and add it to the graph's totals?
+        """
+
+        G, vertices = build_random_graph()
+
+        with G.profile() as profile:
+            G.minimum_range_all(vertices[0])
+
+        assert profile.instrumentation.calls['minimum_range_all'] == 1
+        assert profile.stats.total_calls > 0, "cProfile should have run"
+        assert G.instrumentation is None, "profile shouldn't leave an uninstrumented graph instrumented"
+
+        stats = G.instrument()
+        G.find_path(vertices[0], vertices[1], 100)
+        with G.profile('tracemalloc') as profile:
+            G.minimum_range_all(vertices[1])
+
+        assert profile.peak > 0 and profile.memory is not None
+        assert profile.instrumentation.calls['find_path'] == 0, "Only the block is attributed to the profile"
+        assert stats.calls['find_path'] == 1 and stats.calls['minimum_range_all'] == 1, \
+            "The block should be added to the graph's totals"
+
+    def test_unknown_profile_kind(self):
+        """
+        Is an unknown profile kind rejected?
+        """
+
+        G, vertices = build_random_graph()
+        with self.assertRaises(ValueError):
+            with G.profile('perf'):
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+"""
+Test File 2
+-----------
+
+Tests the minimum range queries that answer many targets at once.
+
+python3 -m unittest tests/test_minimum_range.py
+"""
+
+import math
+import random
+import unittest
+
+from graph import Graph
+from range_index import RangeIndex
+from tests.helpers import legacy_minimum_range, random_graph
+
+
+def approx_value(a, b):
+    return math.isclose(a, b, abs_tol=0.001)
+
+
+def build_simple_graph():
+    """
+    Builds the graph used by the single function tests.
+                A
+              / | \
+             B  C  D
+               / | /
+              E   F
+    :return: The graph and its vertices A to F.
+    """
+
+    G = Graph()
+
+    A = G.insert_vertex(0, 0)
+    B = G.insert_vertex(2, 0)
+    C = G.insert_vertex(2, 4)
+    D = G.insert_vertex(2, 6)
+    E = G.insert_vertex(3, 3)
+    F = G.insert_vertex(4, 6)
+
+    G.insert_edge(A, B)
+    G.insert_edge(A, C)
+    G.insert_edge(A, D)
+    G.insert_edge(C, E)
+    G.insert_edge(C, F)
+    G.insert_edge(D, F)
+
+    return G, (A, B, C, D, E, F)
+
+
+class MinimumRangeAllTest(unittest.TestCase):
+
+    def test_minimum_range_all_matches_minimum_range(self):
+        """
+        Does every entry of minimum_range_all agree with minimum_range?
+        """
+
+        G, vertices = build_simple_graph()
+        A = vertices[0]
+
+        ranges = G.minimum_range_all(A)
+
+        assert len(ranges) == len(vertices), \
+            "Expected a range for every vertex, got {}".format(ranges)
+
+        for v in vertices:
+            assert approx_value(ranges[v], G.minimum_range(A, v)), \
+                "[minimum_range_all] {} Expected: {} | Got: {}".format(
+                    v, G.minimum_range(A, v), ranges[v])
+
+        assert approx_value(ranges[vertices[5]], 7.2111)
+
+    def test_unreachable_vertex_has_infinite_range(self):
+        """
+        Is a vertex with no edges reported as unreachable?
+        """
+
+        G, vertices = build_simple_graph()
+        lonely = G.insert_vertex(1, 1)
+
+        assert G.minimum_range(vertices[0], lonely) == float('inf')
+        assert G.minimum_range_all(vertices[0])[lonely] == float('inf')
+
+    def test_cache_is_dropped_when_graph_changes(self):
+        """
+        Do cached ranges follow edge inserts, moves and removals?
+        """
+
+        G, (A, B, C, D, E, F) = build_simple_graph()
+
+        assert approx_value(G.minimum_range(A, F), 7.2111)
+
+        G.move_vertex(D, 0, 1)
+        assert approx_value(G.minimum_range(A, F), 7.2111)
+
+        G.insert_edge(B, F)
+        assert approx_value(G.minimum_range(A, F), 7.2111)
+
+        G.move_vertex(F, 3, 0)
+        assert approx_value(G.minimum_range(A, F), 3)
+
+        G.remove_vertex(B)
+        assert approx_value(G.minimum_range(A, F), 3)
+
+        G.remove_vertex(D)
+        assert approx_value(G.minimum_range(A, F), 4.4721)
+
+    def test_matches_legacy_selection_loop(self):
+        """
+        Does minimum_range agree with the original O(V^2) selection loop on
+        random graphs, including unreachable stations?
+        """
+
+        rng = random.Random(1)
+        for _ in range(5):
+            G, vertices = random_graph(rng, 40, 60, high=50)
+
+            for b in vertices[:5]:
+                for s in vertices:
+                    expected = legacy_minimum_range(G, b, s)
+                    res = G.minimum_range(b, s)
+                    assert res == expected or approx_value(res, expected), \
+                        "[minimum_range] Expected: {} | Got: {}".format(expected, res)
+
+
+class HotBaseCacheTest(unittest.TestCase):
+
+    def test_least_recently_used_base_is_evicted(self):
+        """
+        Are the indexes of the least recently used bases dropped first?
+        """
+
+        G, (A, B, C, D, E, F) = build_simple_graph()
+        G.range_cache_size = 2
+
+        G.minimum_range(A, F)
+        G.minimum_range(B, F)
+        G.minimum_range(A, E)
+        G.minimum_range(C, F)
+
+        assert list(G._range_indexes) == [A, C], \
+            "Expected bases A and C to stay, got {}".format(list(G._range_indexes))
+
+    def test_changes_only_drop_affected_bases(self):
+        """
+        Do edge inserts and moves only drop the indexes whose ranges they change?
+        """
+
+        G, (A, B, C, D, E, F) = build_simple_graph()
+        X = G.insert_vertex(10, 10)
+        Y = G.insert_vertex(11, 10)
+
+        G.minimum_range_all(A)
+        G.minimum_range_all(X)
+
+        # X and Y can't be reached from A, so A's ranges stand.
+        G.insert_edge(X, Y)
+        assert A in G._range_indexes and X not in G._range_indexes
+
+        # Doesn't lower the range of B or D.
+        G.minimum_range_all(X)
+        G.insert_edge(B, D)
+        assert A in G._range_indexes and X in G._range_indexes
+
+        G.move_vertex(E, 1, 1)
+        assert A not in G._range_indexes and X in G._range_indexes
+        assert approx_value(G.minimum_range(A, E), 4.4721), "E is still reached through C"
+
+    def test_kept_indexes_match_a_rebuild(self):
+        """
+        Does every index kept through random changes match one built from scratch?
+        """
+
+        rng = random.Random(19)
+        G = Graph()
+        vertices = [G.insert_vertex(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(40)]
+        for _ in range(30):
+            u, v = rng.sample(vertices, 2)
+            if not u.has_neighbour(v):
+                G.insert_edge(u, v)
+
+        for _ in range(150):
+            for b in rng.sample(vertices, 3):
+                G.minimum_range(b, b)
+
+            step = rng.random()
+            u, v = rng.sample(vertices, 2)
+            if step < 0.5 and not u.has_neighbour(v):
+                G.insert_edge(u, v)
+            elif step < 0.8:
+                G.move_vertex(u, rng.uniform(0, 100), rng.uniform(0, 100))
+            elif step < 0.9:
+                vertices.append(G.insert_vertex(rng.uniform(0, 100), rng.uniform(0, 100)))
+            elif len(vertices) > 10:
+                vertices.remove(u)
+                G.remove_vertex(u)
+
+            for b, index in G._range_indexes.items():
+                fresh = RangeIndex(b, G._vertices)
+                for s in vertices:
+                    assert index.threshold(s) == fresh.threshold(s), \
+                        "Stale range from {} to {}".format(b, s)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+"""
+Test File 10
+------------
+
+Tests the asyncio GraphService with an in-process client.
+
+python3 -m unittest tests/test_service.py
+"""
+
+import asyncio
+import concurrent.futures
+import random
+import threading
+import time
+import unittest
+
+from graph import Graph
+from service import GraphService
+from tests.helpers import random_graph
+
+
+class RecordingGraph:
+    """
+    Stands in for a Graph, recording how many calls overlap.
+    """
+
+    def __init__(self):
+        self.guard = threading.Lock()
+        self.readers = 0
+        self.writers = 0
+        self.overlaps = []
+
+    def _enter(self, writing):
+        with self.guard:
+            if writing:
+                self.writers += 1
+            else:
+                self.readers += 1
+            self.overlaps.append((self.readers, self.writers))
+
+    def _leave(self, writing):
+        with self.guard:
+            if writing:
+                self.writers -= 1
+            else:
+                self.readers -= 1
+
+    def minimum_range(self, b, s):
+        self._enter(False)
+        time.sleep(0.01)
+        self._leave(False)
+        return b + s
+
+    def move_vertex(self, v, new_x, new_y):
+        self._enter(True)
+        time.sleep(0.01)
+        self._leave(True)
+
+
+class GraphServiceTest(unittest.TestCase):
+
+    def test_identical_queries_are_coalesced(self):
+        """
+        Do concurrent identical queries run only once?
+        """
+
+        G = Graph()
+        b = G.insert_vertex(0, 0)
+        s = G.insert_vertex(3, 4)
+        G.insert_edge(b, s)
+        service = GraphService(G)
+
+        async def client():
+            return await asyncio.gather(*[service.minimum_range(b, s) for _ in range(50)])
+
+        results = asyncio.run(client())
+
+        assert results == [5] * 50, "Unexpected results {}".format(results)
+        assert service.requests == 50 and service.computations == 1, \
+            "Expected 1 computation, got {}".format(service.computations)
+
+    def test_reads_after_writes_see_the_change(self):
+        """
+        Does a query issued after a move see the moved station?
+        """
+
+        G = Graph()
+        b = G.insert_vertex(0, 0)
+        s = G.insert_vertex(3, 4)
+        G.insert_edge(b, s)
+        service = GraphService(G)
+
+        async def client():
+            before = await service.minimum_range(b, s)
+            await service.move_vertex(s, 6, 8)
+            after = await service.minimum_range(b, s)
+            return before, after
+
+        assert asyncio.run(client()) == (5, 10)
+
+    def test_writes_never_overlap_reads(self):
+        """
+        Does a mutation wait for running queries and hold back new ones?
+        """
+
+        G = RecordingGraph()
+        service = GraphService(G)
+
+        async def client():
+            calls = []
+            for i in range(30):
+                if i % 5 == 0:
+                    calls.append(service.move_vertex(None, i, i))
+                else:
+                    calls.append(service.minimum_range(i, 1))
+            return await asyncio.gather(*calls)
+
+        asyncio.run(client())
+
+        assert all(writers == 0 or (writers == 1 and readers == 0) for readers, writers in G.overlaps), \
+            "Reads and writes overlapped: {}".format(G.overlaps)
+        assert any(readers > 1 for readers, writers in G.overlaps), "Reads never ran concurrently"
+
+    def test_parallel_reads_on_a_real_graph(self):
+        """
+        Do many different queries running on threads at once, with tiny
+        caches that keep evicting and writes that keep dropping the hull,
+        give the same answers as running them one by one?
+        """
+
+        rng = random.Random(15)
+        G, vertices = random_graph(rng, 300, 900, max_length=20)
+        G.range_cache_size = 2
+        G.distance_cache_size = 2
+
+        queries = []
+        for _ in range(400):
+            b, s = rng.sample(vertices, 2)
+            queries.append(rng.choice([('minimum_range', b, s), ('find_path', b, s, 60),
+                                       ('find_emergency_range', b)]))
+
+        def answer(graph, query):
+            res = getattr(graph, query[0])(*query[1:])
+            return len(res) if isinstance(res, list) else res
+
+        executor = concurrent.futures.ThreadPoolExecutor(8)
+        service = GraphService(G, executor)
+
+        async def client():
+            results = []
+            for start in range(0, len(queries), 50):
+                results += await asyncio.gather(*[service.request(*q) for q in queries[start:start + 50]])
+                # Moving a hull vertex (back and forth) makes the next
+                # emergency range queries rebuild the hull.
+                v = G._current_hull()[0]
+                x_pos, y_pos = v.x_pos, v.y_pos
+                await service.move_vertex(v, x_pos - 1, y_pos)
+                await service.move_vertex(v, x_pos, y_pos)
+            return results
+
+        try:
+            results = asyncio.run(client())
+        finally:
+            executor.shutdown()
+
+        results = [len(r) if isinstance(r, list) else r for r in results]
+        expected = [answer(G, q) for q in queries]
+        assert results == expected, "Parallel reads gave different answers"
+
+    def test_unknown_request(self):
+        """
+        Is an unknown request rejected?
+        """
+
+        service = GraphService(Graph())
+
+        with self.assertRaises(ValueError):
+            asyncio.run(service.request('clear'))
+
+
+if __name__ == '__main__':
+    unittest.main()
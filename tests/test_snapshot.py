@@ -0,0 +1,116 @@
+"""
+Test File 11
+------------
+
+Tests that graph snapshots keep answering for their own version.
+
+python3 -m unittest tests/test_snapshot.py
+"""
+
+import random
+import unittest
+
+from snapshot import CHUNK_BITS, GraphSnapshot
+from tests.helpers import random_graph
+
+
+def answers(view, bases, vertices):
+    """
+    Every query type from a few bases, on a Graph or a snapshot.
+    """
+
+    result = []
+    for b in bases:
+        result.append(view.find_emergency_range(b))
+        ranges = view.minimum_range_all(b)
+        for s in vertices:
+            result.append(ranges.get(s))
+            result.append(view.find_path(b, s, 50))
+    return result
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def test_snapshot_is_unaffected_by_later_changes(self):
+        """
+        Does an old snapshot answer as the graph did when it was taken?
+        """
+
+        rng = random.Random(6)
+        G, vertices = random_graph(rng, 60, 120)
+        bases = vertices[:3]
+
+        snap = G.snapshot()
+        expected = answers(G, bases, vertices)
+
+        for v in vertices[3:20]:
+            G.move_vertex(v, rng.uniform(0, 100), rng.uniform(0, 100))
+        G.remove_vertex(vertices[30])
+        u = vertices[35]
+        G.insert_edge(u, next(v for v in vertices[40:] if v is not u and not u.has_neighbour(v)))
+
+        assert answers(snap, bases, vertices) == expected, "Old snapshot changed"
+
+    def test_incremental_snapshot_matches_full_capture(self):
+        """
+        Does a snapshot built from the previous one match one built from
+        scratch, and match the live graph?
+        """
+
+        rng = random.Random(7)
+        G, vertices = random_graph(rng, 60, 120)
+        G.snapshot()
+
+        for step in range(30):
+            v = rng.choice(vertices)
+            if step % 7 == 0:
+                G.remove_vertex(v)
+                vertices.remove(v)
+            elif step % 3 == 0:
+                w = G.insert_vertex(rng.uniform(0, 100), rng.uniform(0, 100))
+                G.insert_edge(w, v)
+                vertices.append(w)
+            else:
+                G.move_vertex(v, rng.uniform(0, 100), rng.uniform(0, 100))
+
+            snap = G.snapshot()
+            full = GraphSnapshot.capture(G)
+
+            assert snap._positions == full._positions and snap._adjacency == full._adjacency, \
+                "Incremental snapshot differs at step {}".format(step)
+            assert answers(snap, vertices[:2], vertices) == answers(G, vertices[:2], vertices)
+
+    def test_unchanged_chunks_are_shared(self):
+        """
+        Does a snapshot after one move share every chunk but the moved
+        vertex's with the previous one?
+        """
+
+        G, vertices = random_graph(random.Random(3), 2000, 4000)
+        old = G.snapshot()
+        v = vertices[1000]
+
+        G.move_vertex(v, 500, 500)
+        new = G.snapshot()
+
+        changed = [k for k, chunk in new._positions.chunks.items() if chunk is not old._positions.chunks[k]]
+        assert changed == [v.id >> CHUNK_BITS], "Expected only v's chunk to be copied, got {}".format(changed)
+        assert new.position(v) == (500, 500) and old.position(v) != (500, 500)
+        assert len(new) == len(old) == 2000
+
+    def test_unchanged_graph_reuses_snapshot(self):
+        """
+        Is the same snapshot returned while nothing changes?
+        """
+
+        G, vertices = random_graph(random.Random(1), 10, 20)
+
+        snap = G.snapshot()
+        assert G.snapshot() is snap
+
+        G.move_vertex(vertices[0], 500, 500)
+        assert G.snapshot() is not snap and G.snapshot().version > snap.version
+
+
+if __name__ == '__main__':
+    unittest.main()
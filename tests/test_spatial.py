@@ -0,0 +1,217 @@
+"""
+Test File 7
+-----------
+
+Tests the coordinate and grid indexes behind move_vertex, stations_within
+and nearest_station.
+
+python3 -m unittest tests/test_spatial.py
+"""
+
+import math
+import random
+import time
+import unittest
+
+from graph import Graph
+
+
+class SpatialIndexTest(unittest.TestCase):
+
+    def test_queries_follow_drift(self):
+        """
+        Do stations_within and nearest_station agree with a brute force
+        scan while stations move, appear and disappear?
+        """
+
+        rng = random.Random(9)
+        G = Graph()
+        vertices = [G.insert_vertex(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(150)]
+
+        for step in range(300):
+            v = rng.choice(vertices)
+            if step % 10 == 0:
+                G.remove_vertex(v)
+                vertices.remove(v)
+                vertices.append(G.insert_vertex(rng.uniform(-20, 120), rng.uniform(-20, 120)))
+            else:
+                G.move_vertex(v, rng.uniform(-20, 120), rng.uniform(-20, 120))
+
+            u = rng.choice(vertices)
+            r = rng.uniform(0, 40)
+            expected = set(w for w in vertices if w is not u and G.distance(w, u) <= r)
+            res = G.stations_within(u, r)
+            assert set(res) == expected and len(res) == len(expected), \
+                "[stations_within] Expected: {} | Got: {}".format(expected, res)
+
+            x, y = rng.uniform(-50, 150), rng.uniform(-50, 150)
+            nearest = G.nearest_station(x, y)
+            best = min((w.x_pos - x)**2 + (w.y_pos - y)**2 for w in vertices)
+            assert (nearest.x_pos - x)**2 + (nearest.y_pos - y)**2 == best, \
+                "[nearest_station] {} is not the closest to ({}, {})".format(nearest, x, y)
+
+    def test_move_onto_occupied_position(self):
+        """
+        Is a move onto another station ignored, and allowed once it left?
+        """
+
+        G = Graph()
+        u = G.insert_vertex(1, 1)
+        v = G.insert_vertex(2, 2)
+
+        G.move_vertex(v, 1, 1)
+        assert (v.x_pos, v.y_pos) == (2, 2), "Moved onto an occupied position"
+
+        G.move_vertex(u, 3, 3)
+        G.move_vertex(v, 1, 1)
+        assert (v.x_pos, v.y_pos) == (1, 1)
+        assert G.vertex_at(1, 1) is v and G.vertex_at(2, 2) is None
+
+    def test_stations_sharing_a_position(self):
+        """
+        Does the position stay occupied until every station there left?
+        """
+
+        G = Graph()
+        u = G.insert_vertex(1, 1)
+        v = G.insert_vertex(1, 1)
+        w = G.insert_vertex(5, 5)
+
+        G.remove_vertex(u)
+        G.move_vertex(w, 1, 1)
+        assert (w.x_pos, w.y_pos) == (5, 5)
+        assert G.vertex_at(1, 1) is v
+
+        G.move_vertex(v, 0, 0)
+        G.move_vertex(w, 1, 1)
+        assert (w.x_pos, w.y_pos) == (1, 1)
+
+    def test_empty_graph(self):
+        """
+        Is there no nearest station in an empty graph?
+        """
+
+        assert Graph().nearest_station(0, 0) is None
+
+
+class MoveVerticesTest(unittest.TestCase):
+
+    def test_vertex_moves_through_its_graph(self):
+        """
+        Does moving a vertex directly keep its graph's indexes and caches
+        in step?
+        """
+
+        G = Graph()
+        u = G.insert_vertex(1, 1)
+        v = G.insert_vertex(2, 2)
+        w = G.insert_vertex(9, 9)
+        G.insert_edge(u, v)
+        assert math.isclose(G.minimum_range(u, v), math.sqrt(2))
+        G.snapshot()
+
+        v.move_vertex(5, 5)
+
+        assert (v.x_pos, v.y_pos) == (5, 5)
+        assert math.isclose(G.minimum_range(u, v), math.sqrt(32)), "The cached range wasn't dropped"
+        assert G.vertex_at(5, 5) is v and G.vertex_at(2, 2) is None
+        assert G.snapshot().position(v) == (5, 5)
+
+        v.move_vertex(9, 9)
+        assert (v.x_pos, v.y_pos) == (5, 5) and G.vertex_at(9, 9) is w, "The position is taken"
+
+        G.remove_vertex(v)
+        v.move_vertex(0, 0)
+        assert (v.x_pos, v.y_pos) == (0, 0) and G.vertex_at(0, 0) is None
+
+    def test_batch_can_swap_positions(self):
+        """
+        Can two stations trade places in one batch?
+        """
+
+        G = Graph()
+        u = G.insert_vertex(0, 0)
+        v = G.insert_vertex(1, 1)
+
+        rejected = G.move_vertices([(u, 1, 1), (v, 0, 0)])
+
+        assert rejected == [], "Unexpected rejections: {}".format(rejected)
+        assert (u.x_pos, u.y_pos) == (1, 1) and (v.x_pos, v.y_pos) == (0, 0)
+        assert G.vertex_at(1, 1) is u and G.vertex_at(0, 0) is v
+
+    def test_batch_rejects_collisions(self):
+        """
+        Are updates onto stationary or already claimed positions rejected,
+        along with updates blocked by those?
+        """
+
+        G = Graph()
+        a = G.insert_vertex(0, 0)
+        b = G.insert_vertex(1, 0)
+        c = G.insert_vertex(2, 0)
+        d = G.insert_vertex(3, 0)
+        still = G.insert_vertex(9, 9)
+        outsider = Graph().insert_vertex(5, 5)
+
+        updates = [
+            (a, 5, 5),         # accepted
+            (b, 5, 5),         # claimed by a
+            (c, 9, 9),         # station still is there
+            (d, 2, 0),         # c stays, so its position is still taken
+            (outsider, 7, 7),  # not in this graph
+            (a, 6, 6),         # a already moved in this batch
+        ]
+        rejected = G.move_vertices(updates)
+
+        assert sorted(rejected, key=updates.index) == updates[1:], \
+            "Expected rejections: {} | Got: {}".format(updates[1:], rejected)
+        assert (a.x_pos, a.y_pos) == (5, 5)
+        assert [(v.x_pos, v.y_pos) for v in (b, c, d, still)] == [(1, 0), (2, 0), (3, 0), (9, 9)]
+
+    def test_long_blocked_chain(self):
+        """
+        Is a long chain of stations, each moving onto the next one's
+        position, rejected as a whole when its head is blocked, and
+        accepted as a whole when it isn't?
+        """
+
+        G = Graph()
+        buoys = [G.insert_vertex(i, 0) for i in range(5000)]
+        G.insert_vertex(5000, 0)
+
+        updates = [(v, i + 1, 0) for i, v in enumerate(buoys)]
+        start = time.perf_counter()
+        rejected = G.move_vertices(updates)
+        seconds = time.perf_counter() - start
+
+        assert sorted(rejected, key=updates.index) == updates, "Every buoy should stay put"
+        assert all((v.x_pos, v.y_pos) == (i, 0) for i, v in enumerate(buoys))
+        assert seconds < 1, "A blocked chain took {:.1f}s".format(seconds)
+
+        updates[-1] = (buoys[-1], 5000, 1)
+        assert G.move_vertices(updates) == []
+        assert [G.vertex_at(i + 1, 0) for i in range(4999)] == buoys[:-1]
+
+    def test_batch_matches_single_moves(self):
+        """
+        Do queries after a large batch agree with a brute force scan?
+        """
+
+        rng = random.Random(4)
+        G = Graph()
+        vertices = [G.insert_vertex(rng.uniform(0, 10), rng.uniform(0, 10)) for _ in range(100)]
+        G.nearest_station(0, 0)
+        G.find_emergency_range(vertices[0])
+
+        updates = [(v, rng.uniform(-30, 30), rng.uniform(-30, 30)) for v in vertices[::2]]
+        assert G.move_vertices(updates) == []
+
+        for v in vertices[:10]:
+            expected = max(G.distance(u, v) for u in vertices)
+            assert G.find_emergency_range(v) == expected
+            nearest = G.nearest_station(v.x_pos + 0.01, v.y_pos)
+            assert G.distance(nearest, v) <= 0.02
+
+
+if __name__ == '__main__':
+    unittest.main()
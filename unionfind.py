@@ -0,0 +1,33 @@
+# Disjoint set forest over the integers 0..n-1, with path halving and
+# union by size.
+
+
+class UnionFind:
+    def __init__(self, n):
+        self._parent = list(range(n))
+        self._size = [1] * n
+
+    def find(self, i):
+        parent = self._parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, i, j):
+        """
+        Merges the sets holding i and j.
+        :return: (root, absorbed) - the surviving root and the root that was
+                 merged into it, or None if they were already joined.
+        """
+
+        i = self.find(i)
+        j = self.find(j)
+        if i == j:
+            return None
+
+        if self._size[i] < self._size[j]:
+            i, j = j, i
+        self._parent[j] = i
+        self._size[i] += self._size[j]
+        return i, j
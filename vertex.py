@@ -1,31 +1,52 @@
+import itertools
+
+
 class Vertex:
+    # Vertices compare and hash by identity. Moving a vertex never changes
+    # its hash, so it stays findable in any dict or set it is a key of.
+    # Each vertex also gets a stable integer id, used to order the ends
+    # of an edge.
+    _ids = itertools.count()
+
+    # No per-instance __dict__, which matters with millions of waypoints.
+    __slots__ = ('id', 'x_pos', 'y_pos', '_adjacent', '_graph')
+
     def __init__(self, x_pos, y_pos):
+        self.id = next(Vertex._ids)
         self.x_pos = x_pos
         self.y_pos = y_pos
-        self.edges = []
 
-    def __eq__(self, other):
-        if isinstance(other, Vertex):
-            return other.x_pos == self.x_pos and other.y_pos == self.y_pos
-        return False
+        # Edges keyed by the vertex at the other end, so a neighbour can be
+        # found or dropped in O(1).
+        self._adjacent = {}
 
-    def __ne__(self, other):
-        if isinstance(other, Vertex):
-            return other.x_pos != self.x_pos or other.y_pos != self.y_pos
-        return True
+        # The Graph holding this vertex, which has to hear about its moves.
+        self._graph = None
+
+    @property
+    def edges(self):
+        return list(self._adjacent.values())
 
     def __repr__(self):
         return "V({}, {})".format(self.x_pos, self.y_pos)
 
-    def __hash__(self):
-        return hash(repr(self))
-
     def add_edge(self, e):
-        self.edges.append(e)
+        self._adjacent[e.v if e.u is self else e.u] = e
 
     def remove_edge(self, e):
-        self.edges.remove(e)
+        del self._adjacent[e.v if e.u is self else e.u]
+
+    def has_neighbour(self, v):
+        return v in self._adjacent
 
     def move_vertex(self, x_pos, y_pos):
+        # A vertex in a graph moves through the graph, so its indexes and
+        # caches follow.
+        if self._graph is not None:
+            self._graph.move_vertex(self, x_pos, y_pos)
+        else:
+            self._place(x_pos, y_pos)
+
+    def _place(self, x_pos, y_pos):
         self.x_pos = x_pos;
         self.y_pos = y_pos